@@ -7,6 +7,18 @@ function base64LPCM(base64String) {
         byteArrays[i] = byteCharacters.charCodeAt(i);
     }
 
+    return chunksLPCM([byteArrays]);
+}
+
+function chunksLPCM(chunks) {
+    // Concatenate raw LPCM chunks (e.g. from binary audio frames)
+    const byteArrays = new Uint8Array(chunks.reduce((total, chunk) => total + chunk.length, 0));
+    let position = 0;
+    for (const chunk of chunks) {
+        byteArrays.set(chunk, position);
+        position += chunk.length;
+    }
+
     // Construct WAV header (similar to your Python function)
     const sampleRate = 24000; // 24kHz
     const numChannels = 1; // Mono
@@ -46,4 +58,4 @@ function base64LPCM(base64String) {
     return audioUrl;
 }
 
-export {base64LPCM };
\ No newline at end of file
+export {base64LPCM, chunksLPCM };
\ No newline at end of file
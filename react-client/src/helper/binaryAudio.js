@@ -0,0 +1,27 @@
+// Optional WebSocket sub-protocol: audio travels as raw PCM frames, control events stay JSON.
+// Frame layout: 1 byte frame type, 1 byte content name length N, N bytes content name, then LPCM bytes.
+const BINARY_AUDIO_SUBPROTOCOL = "s2s-binary-audio-v1";
+const AUDIO_INPUT_FRAME = 0x01;
+const AUDIO_OUTPUT_FRAME = 0x02;
+
+function encodeAudioFrame(frameType, contentName, pcmBuffer) {
+    const name = new TextEncoder().encode(contentName);
+    const frame = new Uint8Array(2 + name.length + pcmBuffer.byteLength);
+    frame[0] = frameType;
+    frame[1] = name.length;
+    frame.set(name, 2);
+    frame.set(new Uint8Array(pcmBuffer), 2 + name.length);
+    return frame.buffer;
+}
+
+function decodeAudioFrame(frameBuffer) {
+    const bytes = new Uint8Array(frameBuffer);
+    const nameLength = bytes[1];
+    return {
+        frameType: bytes[0],
+        contentName: new TextDecoder().decode(bytes.subarray(2, 2 + nameLength)),
+        pcm: bytes.subarray(2 + nameLength),
+    };
+}
+
+export { BINARY_AUDIO_SUBPROTOCOL, AUDIO_INPUT_FRAME, AUDIO_OUTPUT_FRAME, encodeAudioFrame, decodeAudioFrame };
@@ -2,7 +2,8 @@ import React, { createRef } from 'react';
 import './s2s.css'
 import { Icon, Alert, Button, Modal, Box, SpaceBetween, Container, ColumnLayout, Header, FormField, Select, Textarea, Checkbox } from '@cloudscape-design/components';
 import S2sEvent from './helper/s2sEvents';
-import {base64LPCM} from './helper/audioHelper';
+import {base64LPCM, chunksLPCM} from './helper/audioHelper';
+import {BINARY_AUDIO_SUBPROTOCOL, AUDIO_INPUT_FRAME, AUDIO_OUTPUT_FRAME, encodeAudioFrame, decodeAudioFrame} from './helper/binaryAudio';
 
 class S2sChatBot extends React.Component {
 
@@ -40,6 +41,10 @@ class S2sChatBot extends React.Component {
         this.audioPlayerRef = createRef();
         this.audioQueue = [];
 
+        // Binary audio sub-protocol: raw PCM frames instead of base64 JSON audio events
+        this.binaryAudio = false;
+        this.audioFrames = {};
+
         this.promptName = null;
         this.textContentName = null;
         this.audioContentName = null;
@@ -116,6 +121,26 @@ class S2sChatBot extends React.Component {
             console.log(error);
         }
     }
+    // Server-side events for the app only: tool progress and citations
+    handleClientEvent (clientEvent) {
+        const data = clientEvent.content || {};
+        const key = `tool-${clientEvent.contentName}`;
+        var chatMessages = this.state.chatMessages;
+
+        if (data.status === "working") {
+            chatMessages[key] = {"content": "Working on it...", "role": "ASSISTANT", "generationStage": "TOOL", "raw": []};
+        }
+        else if (data.partial !== undefined && chatMessages.hasOwnProperty(key)) {
+            const content = chatMessages[key].content;
+            chatMessages[key].content = (content === "Working on it..." ? "" : content) + data.partial;
+        }
+        else if (data.status === "done") {
+            // The model speaks the final answer, which arrives as regular textOutput
+            delete chatMessages[key];
+        }
+        this.setState({chatMessages: chatMessages});
+    }
+
     handleIncomingMessage (message) {
         const eventType = Object.keys(message?.event)[0];
         const role = message.event[eventType]["role"];
@@ -153,6 +178,7 @@ class S2sChatBot extends React.Component {
             case "contentStart":
                 if (contentType === "AUDIO") {
                     audioResponse[contentId] = "";
+                    this.audioFrames[contentId] = [];
                     this.setState({audioResponse: audioResponse});
                 }
                 else if (contentType === "TEXT") {
@@ -173,7 +199,9 @@ class S2sChatBot extends React.Component {
                 break;
             case "contentEnd":
                 if (contentType === "AUDIO") {
-                    var audioUrl = base64LPCM(this.state.audioResponse[contentId]);
+                    const frames = this.audioFrames[contentId];
+                    delete this.audioFrames[contentId];
+                    var audioUrl = frames && frames.length > 0 ? chunksLPCM(frames) : base64LPCM(this.state.audioResponse[contentId]);
                     this.audioEnqueue(audioUrl);
                     //this.audioQueue.enqueue(audioUrl);
                 }
@@ -281,10 +309,14 @@ class S2sChatBot extends React.Component {
     connectWebSocket() {
         // Connect to the S2S WebSocket server
         if (this.socket === null || this.socket.readyState !== WebSocket.OPEN) {
-            this.socket = new WebSocket(process.env.REACT_APP_WEBSOCKET_URL);
+            // Offer the binary audio sub-protocol when enabled; the server may still answer with plain JSON
+            const protocols = process.env.REACT_APP_BINARY_AUDIO === "true" ? [BINARY_AUDIO_SUBPROTOCOL] : [];
+            this.socket = new WebSocket(process.env.REACT_APP_WEBSOCKET_URL, protocols);
+            this.socket.binaryType = "arraybuffer";
         
             this.socket.onopen = () => {
                 console.log("WebSocket connected!");
+                this.binaryAudio = this.socket.protocol === BINARY_AUDIO_SUBPROTOCOL;
                 this.promptName = crypto.randomUUID();
                 this.textContentName = crypto.randomUUID();
                 this.audioContentName = crypto.randomUUID();        
@@ -321,8 +353,20 @@ class S2sChatBot extends React.Component {
 
             // Handle incoming messages
             this.socket.onmessage = (message) => {
+                if (message.data instanceof ArrayBuffer) {
+                    const frame = decodeAudioFrame(message.data);
+                    if (frame.frameType === AUDIO_OUTPUT_FRAME) {
+                        if (this.audioFrames[frame.contentName] === undefined)
+                            this.audioFrames[frame.contentName] = [];
+                        this.audioFrames[frame.contentName].push(frame.pcm);
+                    }
+                    return;
+                }
                 const event = JSON.parse(message.data);
-                this.handleIncomingMessage(event);
+                if (event.client)
+                    this.handleClientEvent(event.client);
+                else
+                    this.handleIncomingMessage(event);
             };
         
             // Handle errors
@@ -409,6 +453,14 @@ class S2sChatBot extends React.Component {
                         const s = Math.max(-1, Math.min(1, resampled[i]));
                         pcmData.setInt16(i * 2, s < 0 ? s * 0x8000 : s * 0x7FFF, true);
                     }
+
+                    // Binary sub-protocol: send the PCM as-is, skipping base64 and JSON
+                    if (this.binaryAudio) {
+                        if (this.socket && this.socket.readyState === WebSocket.OPEN) {
+                            this.socket.send(encodeAudioFrame(AUDIO_INPUT_FRAME, this.audioContentName, buffer));
+                        }
+                        return;
+                    }
     
                     // Convert to binary string and base64 encode
                     let binary = '';
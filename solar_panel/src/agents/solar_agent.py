@@ -4,6 +4,7 @@ import json
 import uuid
 from src.helper.bedrock_agent_helper import AgentsForAmazonBedrock
 from src.helper.knowledge_base_helper import KnowledgeBasesForAmazonBedrock
+from src.helper.client_factory import get_client
 
 # Initialize the helper
 agents = AgentsForAmazonBedrock()
@@ -20,7 +21,7 @@ solar_lambda_name = f"fn-solar-agent-{resource_suffix}"
 dynamoDB_args = None
 
 # Get AWS account ID and region
-account_id = boto3.client("sts").get_caller_identity()["Account"]
+account_id = get_client("sts").get_caller_identity()["Account"]
 region = agents.get_region()
 
 knowledge_base_name = f'{solar_agent_name}-kb'
@@ -36,7 +37,7 @@ kb_id, ds_id = kb.create_or_retrieve_knowledge_base(
 print(f"Knowledge Base ID: {kb_id}")
 print(f"Data Source ID: {ds_id}")
 
-s3_client = boto3.client('s3', region)
+s3_client = get_client('s3', region)
 
 def upload_directory(path, bucket_name):
     for root,dirs,files in os.walk(path):
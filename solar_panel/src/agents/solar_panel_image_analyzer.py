@@ -2,15 +2,42 @@ import base64
 import boto3
 import json
 import os
-import tempfile
+import hashlib
+import re
+import time
 import logging
+import threading
+from botocore.config import Config
+from botocore.exceptions import ClientError
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# Tuned connection pool, keep-alive and adaptive retries, reused across warm invocations
+client_config = Config(
+    max_pool_connections=int(os.environ.get('boto_max_pool_connections', '50')),
+    tcp_keepalive=True,
+    retries={'mode': 'adaptive', 'max_attempts': int(os.environ.get('boto_max_attempts', '5'))}
+)
+
 # Initialize clients
-bedrock_runtime = boto3.client('bedrock-runtime', region_name='us-east-1')
-s3_client = boto3.client('s3')
+bedrock_runtime = boto3.client('bedrock-runtime', region_name='us-east-1', config=client_config)
+s3_client = boto3.client('s3', config=client_config)
+
+# environment variables
+bucket = os.environ.get('solar_panel_image_bucket', 'handsonllms-raghu')
+image_cache_revalidate_seconds = int(os.environ.get('image_cache_revalidate_seconds', '300'))
+analysis_model_id = os.environ.get('solar_panel_image_amount_llm', 'amazon.nova-lite-v1:0')
+analysis_cache_ttl_seconds = int(os.environ.get('analysis_cache_ttl_seconds', '86400'))
+analysis_cache_table = os.environ.get('analysis_cache_table')
+analysis_cache_file = os.environ.get('analysis_cache_file')
+image_variant_min_psnr = float(os.environ.get('image_variant_min_psnr', '32'))
+# PSNR stays high on downscaled bills even after the small print stops being legible,
+# so variants must also keep this many pixels on their longest edge
+image_variant_min_edge = int(os.environ.get('image_variant_min_edge', '1024'))
+
+# Bump whenever the analysis system prompt or instructions change
+prompt_version = 'v1'
 
 # Image mapping dictionary
 solar_panel_images = {
@@ -20,23 +47,247 @@ solar_panel_images = {
     "national grid": "ng_ny.png",
 }
 
+# Alternate names users give the energy companies
+solar_panel_image_aliases = {
+    "eversource energy": "eversource",
+    "ameren illinois": "ameren",
+    "rocky mountain": "rocky mountain power",
+    "rmp": "rocky mountain power",
+    "nationalgrid": "national grid",
+    "ngrid": "national grid",
+}
+
+# Warm-container S3 object cache: S3 key -> {"etag", "body", "validated_at"}
+s3_object_cache = {}
+
+# Warm-container image cache: energy company name -> {"s3_key", "etag", "format", "base64"}
+image_cache = {}
+
+# Pre-resized variant manifest for the analysis model, see helper/image_variants.py
+variant_manifest = {"variants": None, "loaded_at": 0}
+
+def get_cached_object(s3_key):
+    """Return the cached S3 object, revalidating it against S3 by ETag"""
+    cached = s3_object_cache.get(s3_key)
+    if cached and time.time() - cached["validated_at"] < image_cache_revalidate_seconds:
+        return cached
+
+    request = {
+        "Bucket": bucket,
+        "Key": s3_key
+    }
+    if cached:
+        request["IfNoneMatch"] = cached["etag"]
+
+    try:
+        response = s3_client.get_object(**request)
+    except ClientError as e:
+        # S3 answers a matching If-None-Match with 304 Not Modified
+        if cached and e.response.get('Error', {}).get('Code') in ('304', 'NotModified'):
+            cached["validated_at"] = time.time()
+            return cached
+        raise
+
+    entry = {
+        "etag": response['ETag'],
+        "body": response['Body'].read(),
+        "validated_at": time.time()
+    }
+    s3_object_cache[s3_key] = entry
+    return entry
+
+def load_variant_manifest():
+    """Return the image variants published for the analysis model, or {} if there are none"""
+    if variant_manifest["variants"] is not None and time.time() - variant_manifest["loaded_at"] < image_cache_revalidate_seconds:
+        return variant_manifest["variants"]
+
+    try:
+        manifest = json.loads(get_cached_object('solar_panel/images/variants/manifest.json')["body"])
+        variant_manifest["variants"] = manifest.get(analysis_model_id, {})
+    except ClientError as e:
+        logger.info(f"No image variant manifest available: {str(e)}")
+        variant_manifest["variants"] = {}
+    variant_manifest["loaded_at"] = time.time()
+    return variant_manifest["variants"]
+
+def select_image_variant(image_name):
+    """Pick the smallest pre-encoded variant that meets the quality and resolution targets, else the original PNG"""
+    # Variants are listed smallest payload first
+    for variant in load_variant_manifest().get(image_name, []):
+        if variant["psnr"] >= image_variant_min_psnr and max(variant["width"], variant["height"]) >= image_variant_min_edge:
+            return variant["key"], variant["format"], True
+    return f'solar_panel/images/{image_name}', 'png', False
+
+def get_cached_image(image_key):
+    """Return the cached, base64 encoded image entry for an energy company"""
+    s3_key, image_format, pre_encoded = select_image_variant(solar_panel_images[image_key])
+    s3_object = get_cached_object(s3_key)
+
+    cached = image_cache.get(image_key)
+    if cached and cached["s3_key"] == s3_key and cached["etag"] == s3_object["etag"]:
+        return cached
+
+    body = s3_object["body"]
+    entry = {
+        "s3_key": s3_key,
+        "etag": s3_object["etag"],
+        "format": image_format,
+        "base64": body.decode('utf-8') if pre_encoded else base64.b64encode(body).decode('utf-8')
+    }
+    image_cache[image_key] = entry
+    return entry
+
 def download_and_encode(energy_company_name):
-    """Download image from S3 and return base64 encoded string"""
+    """Fetch image from S3 (or the warm-container cache) and return base64 encoded string"""
     try:
-        bucket = 'handsonllms-raghu'
-        local_path = os.path.join(tempfile.gettempdir(), solar_panel_images[energy_company_name])
-        
-        # Download image from S3
-        s3_client.download_file(bucket, f'solar_panel/images/{solar_panel_images[energy_company_name]}', local_path)
-        
-        # Encode to base64
-        with open(local_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode('utf-8')
-            
+        return get_cached_image(energy_company_name)["base64"]
     except Exception as e:
         logger.error(f"Image processing error: {str(e)}")
         return None
 
+# Analysis result cache: in-memory tier plus an optional persistent tier
+# (DynamoDB table keyed by cache_key with TTL on expires_at, or a local JSON file)
+analysis_cache = {}
+dynamodb_resource = boto3.resource('dynamodb', config=client_config) if analysis_cache_table else None
+# The file tier is read, modified and rewritten whole; batch workers share it
+analysis_cache_file_lock = threading.Lock()
+
+def normalize_query(query):
+    """Lowercase the query and collapse punctuation and whitespace"""
+    return " ".join(re.findall(r'[a-z0-9]+', (query or '').lower()))
+
+def analysis_cache_key(image_etag, query, chat_history=None):
+    """Build the cache key from (image ETag, normalized query, chat history, model ID, prompt version);
+    the prompt includes the chat history, so an answer is only reused for the same conversation"""
+    key = json.dumps([image_etag, normalize_query(query), chat_history or [], analysis_model_id, prompt_version],
+                     sort_keys=True, default=str)
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+def load_analysis_cache_file():
+    if analysis_cache_file and os.path.exists(analysis_cache_file):
+        with open(analysis_cache_file) as f:
+            return json.load(f)
+    return {}
+
+def save_analysis_cache_file(entries):
+    # Write a temp file and swap it in, so readers never see a partly written file
+    temp_file = f"{analysis_cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_file, 'w') as f:
+        json.dump(entries, f)
+    os.replace(temp_file, analysis_cache_file)
+
+def get_cached_analysis(cache_key):
+    """Return a cached, unexpired analysis from the in-memory or persistent tier"""
+    now = time.time()
+    entry = analysis_cache.get(cache_key)
+    if entry and entry["expires_at"] > now:
+        return entry["analysis"]
+
+    try:
+        if dynamodb_resource:
+            item = dynamodb_resource.Table(analysis_cache_table).get_item(Key={"cache_key": cache_key}).get('Item')
+            entry = {"analysis": item["analysis"], "image_key": item["image_key"], "expires_at": float(item["expires_at"])} if item else None
+        elif analysis_cache_file:
+            with analysis_cache_file_lock:
+                entry = load_analysis_cache_file().get(cache_key)
+    except Exception as e:
+        logger.error(f"Analysis cache read error: {str(e)}")
+        entry = None
+
+    if entry and entry["expires_at"] > now:
+        analysis_cache[cache_key] = entry
+        return entry["analysis"]
+    return None
+
+def put_cached_analysis(cache_key, image_key, analysis):
+    """Store an analysis in the in-memory tier and, when configured, the persistent tier"""
+    entry = {"analysis": analysis, "image_key": image_key, "expires_at": time.time() + analysis_cache_ttl_seconds}
+    analysis_cache[cache_key] = entry
+
+    try:
+        if dynamodb_resource:
+            dynamodb_resource.Table(analysis_cache_table).put_item(Item={
+                "cache_key": cache_key,
+                "analysis": analysis,
+                "image_key": image_key,
+                "expires_at": int(entry["expires_at"])
+            })
+        elif analysis_cache_file:
+            with analysis_cache_file_lock:
+                entries = load_analysis_cache_file()
+                entries[cache_key] = entry
+                save_analysis_cache_file(entries)
+    except Exception as e:
+        logger.error(f"Analysis cache write error: {str(e)}")
+
+def invalidate_analysis_cache(image_key=None):
+    """Drop cached analyses for one image key, or all of them, from every tier"""
+    def matches(entry):
+        return image_key is None or entry.get("image_key") == image_key
+
+    stale_keys = [key for key, entry in list(analysis_cache.items()) if matches(entry)]
+    for key in stale_keys:
+        analysis_cache.pop(key, None)
+    removed = len(stale_keys)
+
+    try:
+        if dynamodb_resource:
+            table = dynamodb_resource.Table(analysis_cache_table)
+            scan_kwargs = {"ProjectionExpression": "cache_key, image_key"}
+            while True:
+                page = table.scan(**scan_kwargs)
+                with table.batch_writer() as batch:
+                    for item in page.get('Items', []):
+                        if matches(item):
+                            batch.delete_item(Key={"cache_key": item["cache_key"]})
+                if 'LastEvaluatedKey' not in page:
+                    break
+                scan_kwargs["ExclusiveStartKey"] = page['LastEvaluatedKey']
+        elif analysis_cache_file:
+            with analysis_cache_file_lock:
+                entries = load_analysis_cache_file()
+                save_analysis_cache_file({key: entry for key, entry in entries.items() if not matches(entry)})
+    except Exception as e:
+        logger.error(f"Analysis cache invalidation error: {str(e)}")
+
+    return removed
+
+# Fast-path resolver counters for the warm container
+name_resolver_stats = {"hits": 0, "misses": 0}
+
+def chat_history_texts(chat_history):
+    """Return the text of the chat history messages, most recent first"""
+    texts = []
+    for message in reversed(chat_history or []):
+        if isinstance(message, dict):
+            for block in message.get('content') or []:
+                if isinstance(block, dict) and block.get('text'):
+                    texts.append(block['text'])
+        elif message:
+            texts.append(str(message))
+    return texts
+
+def match_energy_company_name(text):
+    """Match a known energy company name or alias in text; no fuzzy matching, so a near-miss name
+    falls through to the "Could not identify" path instead of selecting another company's bill"""
+    words = re.findall(r'[a-z]+', text.lower())
+    names = {**{name: name for name in solar_panel_images}, **solar_panel_image_aliases}
+
+    # Longest phrases first so "rocky mountain power" wins over "rocky mountain"
+    phrases = [" ".join(words[i:i + size]) for size in (3, 2, 1) for i in range(len(words) - size + 1)]
+    for phrase in phrases:
+        if phrase in names:
+            return names[phrase]
+    return None
+
+def resolve_energy_company_name(query, chat_history):
+    """Resolve the energy company name from the query, then the chat history, without a model call"""
+    for text in [query] + chat_history_texts(chat_history):
+        energy_company_name = match_energy_company_name(text)
+        if energy_company_name:
+            return energy_company_name
+    return None
+
 def extract_energry_company_name(query, chat_history):
     """Use Nova Micro model to extract energy company name from query"""
     try:
@@ -66,10 +317,23 @@ def lambda_handler(event, context):
         query = event.get('query', '')
         chat_history = event.get('chatHistory', [])
         logger.info(f"chat_history: {chat_history}")
+
+        # Explicit cache invalidation, optionally scoped to one image key
+        if event.get('invalidateCache'):
+            removed = invalidate_analysis_cache(event.get('energy_company_name'))
+            return {
+                "body": json.dumps({"response": f"Invalidated {removed} cached analyses"})
+            }
         
-        # Step 1: Extract energy company name using Nova Micro
-        energy_company_name = extract_energry_company_name(query, chat_history).lower()
-        logger.info(f"Extracted energy company name: {energy_company_name}")
+        # Step 1: Resolve energy company name deterministically, fall back to Nova Micro on a miss
+        energy_company_name = resolve_energy_company_name(query, chat_history)
+        if energy_company_name:
+            name_resolver_stats["hits"] += 1
+        else:
+            name_resolver_stats["misses"] += 1
+            energy_company_name = extract_energry_company_name(query, chat_history)
+            energy_company_name = match_energy_company_name(energy_company_name) if energy_company_name else None
+        logger.info(f"Extracted energy company name: {energy_company_name}, resolver stats: {name_resolver_stats}")
 
         if not energy_company_name or energy_company_name not in solar_panel_images:
             return {
@@ -82,6 +346,20 @@ def lambda_handler(event, context):
             return {
                 "body": json.dumps({"response": "Error processing energy company image"})
             }
+
+        # Serve repeat questions about an unchanged image from the analysis cache
+        cache_key = analysis_cache_key(image_cache[energy_company_name]["etag"], query, chat_history)
+        analysis = get_cached_analysis(cache_key)
+        if analysis:
+            logger.info(f"Analysis cache hit for energy company name: {energy_company_name}")
+            return {
+                "body": json.dumps({
+                    "response": analysis,
+                    "energy_company_name": energy_company_name,
+                    "image_used": solar_panel_images[energy_company_name],
+                    "cached": True
+                })
+            }
         
         # Step 3: Create multimodal payload for Nova Lite
         system_prompt = [{
@@ -93,7 +371,7 @@ def lambda_handler(event, context):
             "content": [
                 {
                     "image": {
-                        "format": "png",
+                        "format": image_cache[energy_company_name]["format"],
                         "source": {"bytes": base64_image}
                     }
                 },
@@ -105,7 +383,7 @@ def lambda_handler(event, context):
         
         # Invoke Nova Lite model
         response = bedrock_runtime.invoke_model(
-            modelId=os.environ.get('solar_panel_image_amount_llm', 'amazon.nova-lite-v1:0'),
+            modelId=analysis_model_id,
             body=json.dumps({
                 "schemaVersion": "messages-v1",
                 "messages": messages,
@@ -121,6 +399,7 @@ def lambda_handler(event, context):
         # Parse model response
         model_output = json.loads(response['body'].read())
         analysis = model_output['output']['message']['content'][0]['text']
+        put_cached_analysis(cache_key, energy_company_name, analysis)
         
         return {
             "body": json.dumps({
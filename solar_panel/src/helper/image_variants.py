@@ -0,0 +1,101 @@
+import argparse
+import base64
+import io
+import json
+import math
+import os
+from PIL import Image, ImageChops, ImageStat
+from src.helper.client_factory import get_client
+
+# Target resolutions (longest edge, in pixels) per multimodal model
+model_resolutions = {
+    "amazon.nova-lite-v1:0": [1024, 1280],
+    "amazon.nova-pro-v1:0": [1024, 1536],
+}
+
+# Below this longest edge the small print on a utility bill (amount due, dates) is no longer
+# legible, whatever the PSNR says; keep in line with image_variant_min_edge in the analyzer
+bill_min_resolution = 1024
+
+# Output encodings and their quality settings
+variant_formats = {
+    "jpeg": {"format": "JPEG", "quality": 85},
+    "webp": {"format": "WEBP", "quality": 80},
+}
+
+s3_prefix = 'solar_panel/images'
+manifest_name = 'manifest.json'
+
+def psnr(original, variant):
+    """Peak signal-to-noise ratio of the variant, upscaled back to the original size"""
+    restored = variant.resize(original.size, Image.LANCZOS)
+    mse = sum(value ** 2 for value in ImageStat.Stat(ImageChops.difference(original, restored)).rms) / 3
+    return 100.0 if mse == 0 else round(10 * math.log10(255 ** 2 / mse), 2)
+
+def build_variants(source_dir, output_dir):
+    """Generate downscaled, base64-encoded variants for every image and model"""
+    manifest = {}
+    for model_id, resolutions in model_resolutions.items():
+        model_dir = model_id.replace(':', '_')
+        os.makedirs(os.path.join(output_dir, model_dir), exist_ok=True)
+        manifest[model_id] = {}
+
+        for image_name in sorted(os.listdir(source_dir)):
+            if not image_name.lower().endswith('.png'):
+                continue
+            original = Image.open(os.path.join(source_dir, image_name)).convert('RGB')
+            stem = os.path.splitext(image_name)[0]
+            variants = []
+
+            for resolution in resolutions:
+                if resolution >= max(original.size) or resolution < bill_min_resolution:
+                    continue
+                resized = original.copy()
+                resized.thumbnail((resolution, resolution), Image.LANCZOS)
+
+                for image_format, settings in variant_formats.items():
+                    buffer = io.BytesIO()
+                    resized.save(buffer, format=settings["format"], quality=settings["quality"])
+                    payload = base64.b64encode(buffer.getvalue())
+
+                    file_name = f'{stem}_{resolution}.{image_format}.b64'
+                    with open(os.path.join(output_dir, model_dir, file_name), 'wb') as f:
+                        f.write(payload)
+
+                    variants.append({
+                        "key": f'{s3_prefix}/variants/{model_dir}/{file_name}',
+                        "format": image_format,
+                        "width": resized.size[0],
+                        "height": resized.size[1],
+                        "bytes": len(payload),
+                        "psnr": psnr(original, Image.open(buffer).convert('RGB'))
+                    })
+                    print(f"{model_id} {file_name}: {len(payload)} bytes, PSNR {variants[-1]['psnr']} dB")
+
+            manifest[model_id][image_name] = sorted(variants, key=lambda variant: variant["bytes"])
+
+    with open(os.path.join(output_dir, manifest_name), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def upload_variants(output_dir, bucket):
+    """Upload the variants and manifest to S3 next to the original images"""
+    s3_client = get_client('s3')
+    for root, _, files in os.walk(output_dir):
+        for file_name in files:
+            local_path = os.path.join(root, file_name)
+            s3_key = f'{s3_prefix}/variants/{os.path.relpath(local_path, output_dir)}'
+            s3_client.upload_file(local_path, bucket, s3_key)
+            print(f"Uploaded to s3://{bucket}/{s3_key}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate pre-resized, pre-encoded utility bill image variants')
+    parser.add_argument('--source-dir', default='data/images')
+    parser.add_argument('--output-dir', default='data/images/variants')
+    parser.add_argument('--bucket', default=os.environ.get('solar_panel_image_bucket', 'handsonllms-raghu'))
+    parser.add_argument('--upload', action='store_true', help='Upload the variants and manifest to S3')
+    args = parser.parse_args()
+
+    build_variants(args.source_dir, args.output_dir)
+    if args.upload:
+        upload_variants(args.output_dir, args.bucket)
@@ -0,0 +1,76 @@
+"""
+This module contains a shared factory for boto3 clients and resources.
+Clients are cached per (service, region, credentials, config overrides) and reused,
+with a tuned connection pool, TCP keep-alive and adaptive retries. Here is a quick
+example of using the factory; it is shared by the python-server and the agent packages
+next to it, which run with squad/src on the path:
+
+    >>> from client_factory import get_client, client_stats
+    >>> s3_client = get_client('s3', region_name='us-east-1')
+    >>> runtime_client = get_client('bedrock-agent-runtime', read_timeout=600)
+    >>> client_stats()
+    {'created': 2, 'reused': 0, 'cached': 2}
+"""
+import os
+import threading
+import boto3
+from botocore.config import Config
+
+max_pool_connections = int(os.environ.get('boto_max_pool_connections', '50'))
+tcp_keepalive = os.environ.get('boto_tcp_keepalive', 'true').lower() == 'true'
+retry_mode = os.environ.get('boto_retry_mode', 'adaptive')
+max_attempts = int(os.environ.get('boto_max_attempts', '5'))
+
+_cache = {}
+_lock = threading.Lock()
+_stats = {"created": 0, "reused": 0}
+
+
+def build_config(**config_overrides) -> Config:
+    """Return the tuned botocore Config, with optional overrides such as read_timeout"""
+    return Config(
+        max_pool_connections=max_pool_connections,
+        tcp_keepalive=tcp_keepalive,
+        retries={'mode': retry_mode, 'max_attempts': max_attempts}
+    ).merge(Config(**config_overrides))
+
+
+def _get_or_create(kind, service_name, region_name, aws_access_key_id, aws_secret_access_key,
+                   aws_session_token, config_overrides):
+    key = (kind, service_name, region_name, aws_access_key_id, aws_secret_access_key, aws_session_token,
+           tuple(sorted(config_overrides.items())))
+    with _lock:
+        if key in _cache:
+            _stats["reused"] += 1
+            return _cache[key]
+
+        session = boto3.session.Session(
+            aws_access_key_id=aws_access_key_id,
+            aws_secret_access_key=aws_secret_access_key,
+            aws_session_token=aws_session_token,
+            region_name=region_name
+        )
+        factory = session.client if kind == "client" else session.resource
+        _cache[key] = factory(service_name, config=build_config(**config_overrides))
+        _stats["created"] += 1
+        return _cache[key]
+
+
+def get_client(service_name: str, region_name: str = None, aws_access_key_id: str = None,
+               aws_secret_access_key: str = None, aws_session_token: str = None, **config_overrides):
+    """Return a cached boto3 client for the service, region and credentials"""
+    return _get_or_create("client", service_name, region_name, aws_access_key_id, aws_secret_access_key,
+                          aws_session_token, config_overrides)
+
+
+def get_resource(service_name: str, region_name: str = None, aws_access_key_id: str = None,
+                 aws_secret_access_key: str = None, aws_session_token: str = None, **config_overrides):
+    """Return a cached boto3 resource for the service, region and credentials"""
+    return _get_or_create("resource", service_name, region_name, aws_access_key_id, aws_secret_access_key,
+                          aws_session_token, config_overrides)
+
+
+def client_stats() -> dict:
+    """Return how often clients were created versus reused"""
+    with _lock:
+        return {**_stats, "cached": len(_cache)}
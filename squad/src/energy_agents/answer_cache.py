@@ -0,0 +1,282 @@
+import asyncio
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, AsyncIterable, Callable, Optional, Union
+from agent_squad.agents import Agent, AgentOptions, AgentStreamResponse, AmazonBedrockAgent
+from agent_squad.types import ConversationMessage, ParticipantRole
+from agent_squad.utils import Logger
+from client_factory import get_client
+from energy_agents.local_classifier import TRAINING_QUESTIONS, LocalPreClassifier, normalize_query, tokenize
+
+# Serve repeated knowledge-base questions (troubleshooting, maintenance, cleaning) from memory
+ANSWER_CACHE = os.environ.get('answer_cache', 'true').lower() == 'true'
+# Minimum cosine similarity between a question and a cached one to reuse its answer
+SIMILARITY_THRESHOLD = float(os.environ.get('answer_cache_similarity', '0.85'))
+MAX_ENTRIES = int(os.environ.get('answer_cache_max_entries', '512'))
+# Safety net for agents without a configured knowledge base to version against
+ENTRY_TTL_SECONDS = float(os.environ.get('answer_cache_ttl_seconds', '3600'))
+KB_VERSION_TTL_SECONDS = float(os.environ.get('answer_cache_kb_version_ttl_seconds', '60'))
+MIN_TOKENS = 3
+# Overrides the knowledge bases looked up from the Bedrock agents on each supervisor's team,
+# e.g. {"LeadTurbineSupervisorAgent": ["KBID"]}
+KNOWLEDGE_BASES = json.loads(os.environ.get('answer_cache_knowledge_bases', '{}'))
+
+# Only knowledge-base questions are cached: they must use one of these words...
+KNOWLEDGE_BASE_WORDS = {'troubleshoot', 'troubleshooting', 'maintenance', 'maintain', 'preventive', 'preventative',
+                        'prevent', 'clean', 'cleaning', 'cause', 'causes', 'why', 'repair', 'fix', 'best', 'practice',
+                        'practices', 'warranty', 'inspect', 'inspection', 'failure', 'failures', 'damage', 'damages',
+                        'corrosion', 'effect', 'effects', 'impact', 'monitor', 'monitoring', 'recommend',
+                        'recommended', 'steps', 'safety'}
+# ...and none of these, which ask for live catalog and database data (counts, locations, metrics, bills)
+LIVE_DATA_WORDS = {'many', 'count', 'number', 'list', 'located', 'location', 'where', 'details', 'detail', 'status',
+                   'cost', 'costs', 'profit', 'revenue', 'rpm', 'optimal', 'metrics', 'current', 'currently', 'today',
+                   'yesterday', 'latest', 'reading', 'readings', 'image', 'bill', 'savings', 'amount', 'insight',
+                   'insights', 'address', 'price'}
+# Words that flip or contrast a question ("not spinning", "without water", "vs"); a cached answer
+# is only reused for a question with the same ones
+NEGATION_WORDS = {'no', 'not', 'never', 'none', 'nor', 'without', 'except', 'unless', 'cannot', 'vs', 'versus',
+                  'but', 'instead'}
+
+
+def negations(text: str) -> frozenset:
+    """Negation and contrast words in the text, including n't contractions"""
+    return frozenset(word for word in re.findall(r"[a-z]+(?:'t)?", text.lower().replace('\u2019', "'"))
+                     if word in NEGATION_WORDS or word.endswith("n't"))
+
+
+class KnowledgeBaseVersions:
+    """
+    Version of each agent's knowledge bases: the latest ingestion job of every data source.
+    synchronize_data starts an ingestion job, so the version moves when a sync starts and
+    again when it completes. Looked up at most every ttl_seconds per agent.
+
+    The knowledge bases are those associated with the Bedrock agents (AmazonBedrockAgent) on a
+    supervisor's team, found through their alias, unless knowledge_bases names them.
+    """
+
+    def __init__(self, knowledge_bases=None, ttl_seconds=KB_VERSION_TTL_SECONDS, client=None):
+        self.knowledge_bases = {name: [ids] if isinstance(ids, str) else ids
+                                for name, ids in (knowledge_bases if knowledge_bases is not None else KNOWLEDGE_BASES).items()}
+        self.bedrock_agents = {}  # agent name -> [(Bedrock agent id, alias id)]
+        self.ttl_seconds = ttl_seconds
+        self._client = client
+        self._versions = {}  # agent name -> (version, checked_at)
+
+    def add_agent(self, agent: Agent):
+        """Version agent by the knowledge bases of the Bedrock agents on its team, or of itself"""
+        members = getattr(agent, 'team', None) or [agent]
+        bedrock_agents = [(member.agent_id, member.agent_alias_id) for member in members
+                          if isinstance(member, AmazonBedrockAgent)]
+        if bedrock_agents:
+            self.bedrock_agents[agent.name] = bedrock_agents
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = get_client('bedrock-agent', region_name=os.environ.get('AWS_REGION', 'us-east-1'))
+        return self._client
+
+    def _knowledge_base_ids(self, agent_name):
+        if self.knowledge_bases.get(agent_name):
+            return self.knowledge_bases[agent_name]
+        kb_ids = []
+        for agent_id, alias_id in self.bedrock_agents.get(agent_name, []):
+            alias = self.client.get_agent_alias(agentId=agent_id, agentAliasId=alias_id)['agentAlias']
+            for route in alias.get('routingConfiguration', []):
+                summaries = self.client.list_agent_knowledge_bases(
+                    agentId=agent_id, agentVersion=route['agentVersion'], maxResults=100
+                )['agentKnowledgeBaseSummaries']
+                kb_ids.extend(summary['knowledgeBaseId'] for summary in summaries
+                              if summary['knowledgeBaseId'] not in kb_ids)
+        return kb_ids
+
+    def _latest_jobs(self, kb_id):
+        jobs = []
+        data_sources = self.client.list_data_sources(knowledgeBaseId=kb_id, maxResults=100)['dataSourceSummaries']
+        for data_source in data_sources:
+            summaries = self.client.list_ingestion_jobs(
+                knowledgeBaseId=kb_id,
+                dataSourceId=data_source['dataSourceId'],
+                sortBy={'attribute': 'STARTED_AT', 'order': 'DESCENDING'},
+                maxResults=1
+            )['ingestionJobSummaries']
+            if summaries:
+                jobs.append(f"{summaries[0]['ingestionJobId']}:{summaries[0]['status']}")
+        return jobs
+
+    def version(self, agent_name: str) -> str:
+        """Blocking; call from a worker thread"""
+        if not self.knowledge_bases.get(agent_name) and agent_name not in self.bedrock_agents:
+            return 'unversioned'
+        now = time.monotonic()
+        version, checked_at = self._versions.get(agent_name, (None, 0.0))
+        if version is not None and now - checked_at < self.ttl_seconds:
+            return version
+        try:
+            version = '|'.join(job for kb_id in self._knowledge_base_ids(agent_name) for job in self._latest_jobs(kb_id))
+        except Exception as e:
+            Logger.warn(f"Knowledge base version lookup for {agent_name} failed: {e}")
+            # Keep serving the last known version rather than dropping the cache
+            version = version or 'unknown'
+        self._versions[agent_name] = (version, now)
+        return version
+
+
+class TfidfEmbedder:
+    """Sparse TF-IDF vectors over the LocalPreClassifier vocabulary; unseen words get the highest IDF"""
+
+    def __init__(self, training_questions=None):
+        documents = [tokenize(question) for questions in (training_questions or TRAINING_QUESTIONS).values()
+                     for question in questions]
+        document_frequency = Counter(token for document in documents for token in set(document))
+        self.idf = {token: math.log((1 + len(documents)) / (1 + count)) + 1 for token, count in document_frequency.items()}
+        self.unseen_idf = math.log(1 + len(documents)) + 1
+
+    def __call__(self, text: str) -> dict:
+        # Negation words are stopwords to the classifier, but they change what is being asked
+        counts = Counter(tokenize(text))
+        counts.update(negations(text))
+        vector = {token: count * self.idf.get(token, self.unseen_idf) for token, count in counts.items()}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        return {token: weight / norm for token, weight in vector.items()} if norm else {}
+
+
+class SemanticAnswerCache:
+    """
+    Answers per agent and knowledge-base version, found by embedding similarity of the
+    normalized question and reused only when both questions have the same negation words.
+    Only self-contained knowledge-base questions are cached: troubleshooting, maintenance,
+    cleaning and the like, never live catalog data such as counts or metrics, no turbine ids,
+    dates or addresses (anything with digits), and no references back into the conversation.
+    """
+
+    def __init__(self, versions: Optional[KnowledgeBaseVersions] = None, threshold=SIMILARITY_THRESHOLD,
+                 max_entries=MAX_ENTRIES, ttl_seconds=ENTRY_TTL_SECONDS, embed: Optional[Callable[[str], dict]] = None):
+        self.versions = versions or KnowledgeBaseVersions()
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.embed = embed or TfidfEmbedder()
+        self._scopes = {}  # agent name -> {"version": v, "entries": OrderedDict(question -> (vector, answer, stored_at, negations))}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "skipped": 0, "invalidated": 0}
+
+    @staticmethod
+    def cacheable(question: str) -> bool:
+        words = set(re.findall(r'[a-z]+', question.lower()))
+        return (len(normalize_query(question).split()) >= MIN_TOKENS
+                and not re.search(r'\d', question)
+                and not LocalPreClassifier.refers_to_history(question)
+                and bool(words & KNOWLEDGE_BASE_WORDS)
+                and not words & LIVE_DATA_WORDS)
+
+    def _entries(self, agent_name, version):
+        scope = self._scopes.get(agent_name)
+        if scope is None or scope["version"] != version:
+            if scope is not None and scope["entries"]:
+                self.stats["invalidated"] += len(scope["entries"])
+                Logger.info(f"Answer cache for {agent_name} invalidated: knowledge base {scope['version']} -> {version}")
+            scope = self._scopes[agent_name] = {"version": version, "entries": OrderedDict()}
+        return scope["entries"]
+
+    def invalidate(self, agent_name: Optional[str] = None):
+        """Drop cached answers of one agent, or of all agents"""
+        with self._lock:
+            for name in ([agent_name] if agent_name else list(self._scopes)):
+                scope = self._scopes.pop(name, None)
+                if scope:
+                    self.stats["invalidated"] += len(scope["entries"])
+
+    async def lookup(self, agent_name: str, question: str) -> Optional[str]:
+        if not self.cacheable(question):
+            self.stats["skipped"] += 1
+            return None
+        version = await asyncio.to_thread(self.versions.version, agent_name)
+        key = normalize_query(question)
+        now = time.monotonic()
+        with self._lock:
+            entries = self._entries(agent_name, version)
+            best = entries.get(key)
+            score = 1.0 if best else 0.0
+            if best is None:
+                vector = self.embed(question)
+                question_negations = negations(question)
+                for cached_key, entry in entries.items():
+                    if entry[3] != question_negations:
+                        continue
+                    similarity = sum(weight * entry[0].get(token, 0.0) for token, weight in vector.items())
+                    if similarity > score:
+                        score, best, key = similarity, entry, cached_key
+            if best is not None and (score < self.threshold or now - best[2] > self.ttl_seconds):
+                best = None
+            if best is None:
+                self.stats["misses"] += 1
+                return None
+            entries.move_to_end(key)
+            self.stats["hits"] += 1
+        Logger.info(f"Answer cache hit for {agent_name} (similarity {score:.2f}, {self.stats})")
+        return best[1]
+
+    async def store(self, agent_name: str, question: str, answer: str):
+        if not answer or not self.cacheable(question):
+            return
+        version = await asyncio.to_thread(self.versions.version, agent_name)
+        vector = self.embed(question)
+        with self._lock:
+            entries = self._entries(agent_name, version)
+            entries[normalize_query(question)] = (vector, answer, time.monotonic(), negations(question))
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+
+
+class CachedAnswerAgent(Agent):
+    """Agent wrapper that answers from a SemanticAnswerCache and fills it from the wrapped agent"""
+
+    def __init__(self, agent: Agent, cache: SemanticAnswerCache):
+        super().__init__(AgentOptions(name=agent.name, description=agent.description, save_chat=agent.save_chat))
+        self.agent = agent
+        self.cache = cache
+        cache.versions.add_agent(agent)
+
+    def is_streaming_enabled(self) -> bool:
+        return self.agent.is_streaming_enabled()
+
+    @staticmethod
+    async def _stream(message: ConversationMessage):
+        yield AgentStreamResponse(text=message.content[0].get('text', ''))
+        yield AgentStreamResponse(final_message=message)
+
+    async def _stream_and_store(self, input_text: str, response):
+        async for chunk in response:
+            if isinstance(chunk, AgentStreamResponse) and chunk.final_message and chunk.final_message.content:
+                await self.cache.store(self.name, input_text, chunk.final_message.content[0].get('text', ''))
+            yield chunk
+
+    async def process_request(
+        self,
+        input_text: str,
+        user_id: str,
+        session_id: str,
+        chat_history: list[ConversationMessage],
+        additional_params: Optional[dict[str, str]] = None
+    ) -> Union[ConversationMessage, AsyncIterable[Any]]:
+        answer = await self.cache.lookup(self.name, input_text)
+        if answer is not None:
+            message = ConversationMessage(role=ParticipantRole.ASSISTANT.value, content=[{'text': answer}])
+            return self._stream(message) if self.is_streaming_enabled() else message
+
+        response = await self.agent.process_request(input_text, user_id, session_id, chat_history, additional_params)
+        if isinstance(response, ConversationMessage):
+            if response.content:
+                await self.cache.store(self.name, input_text, response.content[0].get('text', ''))
+            return response
+        return self._stream_and_store(input_text, response)
+
+
+def with_answer_cache(agent: Agent, cache: SemanticAnswerCache, enabled: bool = ANSWER_CACHE) -> Agent:
+    return CachedAnswerAgent(agent, cache) if enabled else agent
@@ -0,0 +1,63 @@
+"""Memory benchmark for voice session conversation storage.
+
+Simulates thousands of short voice sessions, each saving a few user/assistant turns for the
+classifier and both supervisors, and reports traced memory as sessions accumulate for the
+unbounded InMemoryChatStorage and for SessionChatStorage. No AWS calls are made.
+
+    python -m energy_agents.benchmark_session_storage --sessions 5000
+"""
+import argparse
+import asyncio
+import tracemalloc
+import uuid
+from agent_squad.storage import InMemoryChatStorage
+from agent_squad.types import ConversationMessage, ParticipantRole
+from energy_agents.session_storage import SessionChatStorage
+
+AGENT_IDS = ['wind-turbine-supervisor-agent', 'solar-panel-supervisor-agent', 'leadturbinesupervisoragent']
+
+
+async def run_sessions(storage, sessions, turns, end_sessions, report_every):
+    """Save `turns` message pairs per agent for each session; return memory samples in MB."""
+    samples = []
+    tracemalloc.start()
+    for index in range(sessions):
+        user_id, session_id = str(uuid.uuid4()), str(uuid.uuid4())
+        for turn in range(turns):
+            for agent_id in AGENT_IDS:
+                await storage.save_chat_message(user_id, session_id, agent_id, ConversationMessage(
+                    role=ParticipantRole.USER.value, content=[{'text': f'What is the status of WT-{turn:03d}? ' * 4}]), 20)
+                await storage.save_chat_message(user_id, session_id, agent_id, ConversationMessage(
+                    role=ParticipantRole.ASSISTANT.value, content=[{'text': 'The turbine is operating normally. ' * 8}]), 20)
+        if end_sessions and hasattr(storage, 'end_session'):
+            storage.end_session(user_id, session_id)
+        if (index + 1) % report_every == 0:
+            samples.append((index + 1, tracemalloc.get_traced_memory()[0] / 2 ** 20))
+    tracemalloc.stop()
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark session-scoped chat storage memory')
+    parser.add_argument('--sessions', type=int, default=5000)
+    parser.add_argument('--turns', type=int, default=3, help='Turns per session')
+    parser.add_argument('--max-sessions', type=int, default=200, help='LRU bound for SessionChatStorage')
+    parser.add_argument('--end-sessions', action='store_true', help='End each session explicitly, as the S2S server does')
+    args = parser.parse_args()
+    report_every = max(1, args.sessions // 10)
+
+    storages = {
+        'InMemoryChatStorage': InMemoryChatStorage(),
+        'SessionChatStorage': SessionChatStorage(max_sessions=args.max_sessions),
+    }
+    results = {name: asyncio.run(run_sessions(storage, args.sessions, args.turns, args.end_sessions, report_every))
+               for name, storage in storages.items()}
+
+    print(f"{'sessions':>10} " + " ".join(f"{name + ' MB':>24}" for name in results))
+    for row in zip(*results.values()):
+        print(f"{row[0][0]:>10} " + " ".join(f"{memory:>24.2f}" for _, memory in row))
+    print(f"SessionChatStorage stats: {storages['SessionChatStorage'].stats()}")
+
+
+if __name__ == '__main__':
+    main()
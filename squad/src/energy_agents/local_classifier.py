@@ -0,0 +1,204 @@
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import List, Optional, Tuple
+from agent_squad.classifiers import Classifier, ClassifierResult
+from agent_squad.types import ConversationMessage
+from agent_squad.utils import Logger
+
+# Minimum cosine similarity to the best centroid, and lead over the runner-up, to skip the LLM
+MIN_SCORE = float(os.environ.get('local_classifier_min_score', '0.15'))
+MIN_MARGIN = float(os.environ.get('local_classifier_min_margin', '0.08'))
+CACHE_SIZE = int(os.environ.get('local_classifier_cache_size', '1024'))
+# Short inputs ("yes", "tell me more") depend on the conversation, so their routing is never cached
+CACHE_MIN_TOKENS = int(os.environ.get('local_classifier_cache_min_tokens', '3'))
+
+# Sample questions from the UI (ui/app_agent.py), by supervisor agent name.
+# SupervisorAgent takes the name of its lead agent, so these are the lead agent names.
+TRAINING_QUESTIONS = {
+    'LeadTurbineSupervisorAgent': [
+        'What troubleshooting steps should I follow if a wind turbine is spinning but not delivering electrical output to the batteries or grid?',
+        'How can condition monitoring systems (CMS) be used to predict and prevent catastrophic drivetrain failures, and what data should I monitor?',
+        'How should I respond if I observe cracks wider than 0.3mm in the pedestal or grout during an inspection?',
+        'What are the most common causes of drivetrain failure in wind turbines?',
+        'List at least 8 typical damages seen on wind turbine bearings. No need for explanation of each',
+        'causes of Electrical Fluting in Turbine',
+        'what causes fretting corrosion',
+        'Why the turbine comes to rest in the same horizontal position, regardless of wind direction',
+        'what are the Effects and impact of Grout - Spalling on turbine',
+        'Should I use strain or vibaration monitoring for bending and shear loads',
+        'What is your opinion on wind turbine subsidies?',
+        'How many turbines located in Texas?',
+        'Get the details of the turbine WT-035',
+        'What is the cost and profit of this turbine on May 12th, 2025',
+        'What foundational issue observed with this turbine',
+        'What are the recommended preventative maintenance to address this foundational issue',
+    ],
+    'LeadSolarPanelSupervisorAgent': [
+        'How often should I clean my solar panels if I live in a dusty desert climate vs. a rainy coastal area?',
+        'What are the cost comparison factors between DIY cleaning vs professional services for a 30-panel system?',
+        'Can using a pressure washer void my solar panel warranty? What cleaning methods are prohibited?',
+        'How to To troubleshoot inverter issues in solar panel',
+        'What are the main causes of zero voltage issue in solar panel',
+        "Based on my monthly electricity bill from Eversource, what's the cost savings with solar panel",
+        "Based on my monthly electricity bill from National Grid, what's the cost savings with solar panel",
+        "Based on my monthly electricity bill from Ameren, what's the cost savings with solar panel",
+        "Based on my monthly electricity bill from Rocky Mountain Power, what's the cost savings with solar panel",
+        'provide the solar insight potential for the address: 1300, Westborough Ln, Leander, TX-78641',
+        'provide the solar insight potential for the address: 1364, Brome Dr, Leander, TX-78641',
+    ],
+}
+
+# Terms that on their own identify the domain
+KEYWORDS = {
+    'LeadTurbineSupervisorAgent': {'turbine', 'wt', 'wind', 'blade', 'drivetrain', 'gearbox', 'nacelle', 'rotor',
+                                   'grout', 'pedestal', 'bearing', 'fluting', 'fretting', 'rpm', 'yaw'},
+    'LeadSolarPanelSupervisorAgent': {'solar', 'panel', 'inverter', 'photovoltaic', 'pv', 'electricity', 'bill',
+                                      'utility', 'eversource', 'ameren', 'roof', 'sunlight'},
+}
+
+# Words that point back into the conversation ("this turbine", "same issue"), so history must decide
+REFERENCE_WORDS = {'this', 'that', 'it', 'its', 'these', 'those', 'them', 'same', 'previous'}
+
+STOPWORDS = {'a', 'an', 'the', 'of', 'to', 'in', 'on', 'for', 'and', 'or', 'is', 'are', 'be', 'i', 'my', 'me',
+             'what', 'how', 'should', 'can', 'do', 'does', 'this', 'that', 'with', 'if', 'vs', 'at', 'it', 'from',
+             'get', 'no', 'need', 'each', 'any', 'your', 'you', 'there', 'which', 'about', 'please'}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords, with a light plural/verb suffix strip"""
+    tokens = []
+    for token in re.findall(r'[a-z]+', text.lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 4 and token.endswith('ing'):
+            token = token[:-3]
+        elif len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def normalize_query(text: str) -> str:
+    return ' '.join(re.findall(r'[a-z0-9]+', text.lower()))
+
+
+class LocalPreClassifier(Classifier):
+    """
+    Routes confidently-classified requests with a local nearest-centroid model and an LRU
+    cache, and falls back to the wrapped classifier (e.g. BedrockClassifier) otherwise.
+    """
+
+    def __init__(self, fallback: Classifier, training_questions=None, keywords=None):
+        super().__init__()
+        self.fallback = fallback
+        self.training_questions = training_questions or TRAINING_QUESTIONS
+        self.keywords = {name: {token for word in words for token in tokenize(word)}
+                         for name, words in (keywords or KEYWORDS).items()}
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {'keyword': 0, 'centroid': 0, 'cache': 0, 'fallback': 0}
+        self._fit()
+
+    def _fit(self):
+        """Build an IDF table and one normalized TF-IDF centroid per agent"""
+        documents = [tokenize(question) for questions in self.training_questions.values() for question in questions]
+        document_frequency = Counter(token for document in documents for token in set(document))
+        self.idf = {token: math.log((1 + len(documents)) / (1 + count)) + 1 for token, count in document_frequency.items()}
+
+        self.centroids = {}
+        for name, questions in self.training_questions.items():
+            centroid = Counter()
+            for question in questions:
+                for token, weight in self._vector(question).items():
+                    centroid[token] += weight
+            self.centroids[name] = self._normalize(centroid)
+
+    def _vector(self, text):
+        counts = Counter(tokenize(text))
+        return self._normalize({token: count * self.idf.get(token, 0.0) for token, count in counts.items()})
+
+    @staticmethod
+    def _normalize(vector):
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        return {token: weight / norm for token, weight in vector.items()} if norm else {}
+
+    def set_agents(self, agents) -> None:
+        super().set_agents(agents)
+        self.fallback.set_agents(agents)
+
+    def set_system_prompt(self, template=None, variables=None) -> None:
+        self.fallback.set_system_prompt(template, variables)
+
+    def _agent_by_name(self, name):
+        return next((agent for agent in self.agents.values() if agent.name == name), None)
+
+    @staticmethod
+    def refers_to_history(input_text: str) -> bool:
+        return bool(set(re.findall(r'[a-z]+', input_text.lower())) & REFERENCE_WORDS)
+
+    def predict(self, input_text: str) -> Optional[Tuple[str, float, str]]:
+        """(agent name, confidence, source) when the text alone identifies the agent, else None"""
+        tokens = set(tokenize(input_text))
+        keyword_hits = [name for name, words in self.keywords.items() if tokens & words]
+        if len(keyword_hits) == 1:
+            return keyword_hits[0], 1.0, 'keyword'
+
+        vector = self._vector(input_text)
+        scores = sorted(((sum(weight * centroid.get(token, 0.0) for token, weight in vector.items()), name)
+                         for name, centroid in self.centroids.items()), reverse=True)
+        if not scores:
+            return None
+        best_score, best_name = scores[0]
+        runner_up = scores[1][0] if len(scores) > 1 else 0.0
+        if best_score >= MIN_SCORE and best_score - runner_up >= MIN_MARGIN:
+            return best_name, round(best_score, 2), 'centroid'
+        return None
+
+    def local_classify(self, input_text: str, chat_history=None) -> Optional[ClassifierResult]:
+        """Confident local routing, or None when the LLM should decide"""
+        prediction = self.predict(input_text)
+        if prediction is None:
+            return None
+        name, confidence, source = prediction
+        # Without a domain keyword, a follow-up needs the history the LLM classifier sees
+        if source == 'centroid' and chat_history and self.refers_to_history(input_text):
+            return None
+        agent = self._agent_by_name(name)
+        if agent is None:
+            return None
+        self.stats[source] += 1
+        return ClassifierResult(selected_agent=agent, confidence=confidence)
+
+    async def classify(self, input_text: str, chat_history: List[ConversationMessage]) -> ClassifierResult:
+        started = time.perf_counter()
+        key = normalize_query(input_text)
+        cacheable = len(key.split()) >= CACHE_MIN_TOKENS and not self.refers_to_history(input_text)
+
+        with self.lock:
+            cached = self.cache.get(key) if cacheable else None
+            if cached:
+                self.cache.move_to_end(key)
+                self.stats['cache'] += 1
+        if cached:
+            result, source = cached, 'cache'
+        else:
+            result, source = self.local_classify(input_text, chat_history), 'local'
+            if result is None:
+                self.stats['fallback'] += 1
+                result, source = await self.fallback.classify(input_text, chat_history), 'fallback'
+            if cacheable and result.selected_agent:
+                with self.lock:
+                    self.cache[key] = result
+                    while len(self.cache) > CACHE_SIZE:
+                        self.cache.popitem(last=False)
+
+        Logger.info(f"Routing via {source} in {(time.perf_counter() - started) * 1000:.1f} ms: "
+                    f"{result.selected_agent.name if result.selected_agent else None}")
+        return result
+
+    async def process_request(self, input_text: str, chat_history: List[ConversationMessage]) -> ClassifierResult:
+        return await self.classify(input_text, chat_history)
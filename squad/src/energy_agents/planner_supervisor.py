@@ -0,0 +1,139 @@
+import asyncio
+import json
+import os
+import re
+import time
+from typing import Any, AsyncIterable, Optional, Union
+from agent_squad.agents import SupervisorAgent, SupervisorAgentOptions
+from agent_squad.agents import BedrockLLMAgent, BedrockLLMAgentOptions
+from agent_squad.types import ConversationMessage
+from agent_squad.utils import Logger
+
+# Plan team calls up front and run independent ones concurrently, instead of one lead agent tool call at a time
+PLANNER_MODE = os.environ.get('supervisor_planner_mode', 'false').lower() == 'true'
+PLANNER_LLM = os.environ.get('supervisor_planner_llm', 'anthropic.claude-3-haiku-20240307-v1:0')
+
+PLANNER_PROMPT = """You split a user's question into sub-questions for a team of agents.
+
+<agents>
+{agents}
+</agents>
+
+Reply with JSON only, in this form:
+{{"tasks": [{{"id": "t1", "recipient": "<agent name>", "content": "<self-contained sub-question>", "depends_on": []}}]}}
+
+- Only use the agents listed above, with their exact names, and only the ones the question needs.
+- Give each sub-question full context (turbine ids, dates, company names, addresses), as agents do not see the conversation.
+- List in depends_on the ids of tasks whose answer a sub-question needs; leave it empty when it can run on its own.
+- Reply {{"tasks": []}} for greetings, follow-ups answered by the conversation so far, or anything the agents cannot help with."""
+
+MERGE_PROMPT = """
+The team has already answered the sub-questions of the User's latest request:
+<planned_responses>
+{responses}
+</planned_responses>
+Answer the User from these responses. Only send messages to agents if something needed is still missing.
+"""
+
+
+class PlannerSupervisorAgent(SupervisorAgent):
+    """
+    SupervisorAgent that asks a small planner model for the team calls a request needs, runs
+    the independent ones together with asyncio.gather (dependent ones in later waves), and then
+    lets the lead agent merge the answers. Falls back to the lead agent's own tool calls when
+    there is no usable plan.
+    """
+
+    def __init__(self, options: SupervisorAgentOptions, planner_model_id: str = PLANNER_LLM):
+        super().__init__(options)
+        self.planner = BedrockLLMAgent(BedrockLLMAgentOptions(
+            name=f"{self.name}Planner",
+            description="Plans the team calls for a user request",
+            model_id=planner_model_id,
+            inference_config={'temperature': 0.0},
+            custom_system_prompt={
+                'template': PLANNER_PROMPT.format(
+                    agents="\n".join(f"{agent.name}: {agent.description}" for agent in self.team))
+            }
+        ))
+
+    async def plan(self, input_text: str, user_id: str, session_id: str,
+                   chat_history: list[ConversationMessage]) -> list[dict[str, Any]]:
+        """Sub-questions for known team agents, or an empty list"""
+        try:
+            response = await self.planner.process_request(input_text, user_id, session_id, chat_history)
+            text = response.content[0].get('text', '') if response.content else ''
+            match = re.search(r'\{.*\}', text, re.DOTALL)
+            tasks = json.loads(match.group(0)).get('tasks', []) if match else []
+        except Exception as e:
+            Logger.warn(f"Planner failed, using the lead agent: {e}")
+            return []
+
+        team_names = {agent.name for agent in self.team}
+        tasks = [task for task in tasks if isinstance(task, dict)
+                 and task.get('recipient') in team_names and task.get('content')]
+        for index, task in enumerate(tasks):
+            task['id'] = str(task.get('id') or f"t{index + 1}")
+        task_ids = {task['id'] for task in tasks}
+        for task in tasks:
+            task['depends_on'] = [dependency for dependency in task.get('depends_on') or [] if dependency in task_ids]
+        return tasks
+
+    def _send(self, task, answers):
+        agent = next(agent for agent in self.team if agent.name == task['recipient'])
+        content = task['content']
+        if task['depends_on']:
+            content += "\n\nUse these results:\n" + "\n".join(answers[dependency] for dependency in task['depends_on'])
+        return self.send_message(agent, content, self.user_id, self.session_id, self.additional_params)
+
+    async def run_plan(self, tasks: list[dict[str, Any]]) -> dict[str, str]:
+        """Run the tasks in waves; each wave is every task whose dependencies have answered"""
+        answers = {}
+        pending = list(tasks)
+        waves = 0
+        started = time.perf_counter()
+        while pending:
+            ready = [task for task in pending if all(dependency in answers for dependency in task['depends_on'])]
+            if not ready:
+                # Circular dependencies; leave the rest to the lead agent
+                break
+            waves += 1
+            results = await asyncio.gather(
+                *(asyncio.to_thread(self._send, task, answers) for task in ready),
+                return_exceptions=True
+            )
+            for task, result in zip(ready, results):
+                answers[task['id']] = (f"{task['recipient']}: failed ({result})"
+                                       if isinstance(result, Exception) else result)
+                pending.remove(task)
+
+        Logger.info(f"Planner ran {len(answers)} team calls in {waves} waves "
+                    f"in {(time.perf_counter() - started) * 1000:.0f} ms")
+        return answers
+
+    async def process_request(
+        self,
+        input_text: str,
+        user_id: str,
+        session_id: str,
+        chat_history: list[ConversationMessage],
+        additional_params: Optional[dict[str, str]] = None
+    ) -> Union[ConversationMessage, AsyncIterable[Any]]:
+        self.user_id = user_id
+        self.session_id = session_id
+        self.additional_params = additional_params
+
+        tasks = await self.plan(input_text, user_id, session_id, chat_history)
+        if not tasks:
+            return await super().process_request(input_text, user_id, session_id, chat_history, additional_params)
+
+        answers = await self.run_plan(tasks)
+
+        agents_history = await self.storage.fetch_all_chats(user_id, session_id)
+        self.lead_agent.set_system_prompt(
+            self.prompt_template.replace('{AGENTS_MEMORY}', self._format_agents_memory(agents_history))
+            + MERGE_PROMPT.format(responses="\n".join(answers.values()))
+        )
+        return await self.lead_agent.process_request(
+            input_text, user_id, session_id, chat_history, additional_params
+        )
@@ -0,0 +1,87 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from agent_squad.storage import InMemoryChatStorage
+
+MAX_SESSIONS = int(os.environ.get('chat_storage_max_sessions', '1000'))
+SESSION_IDLE_TTL_SECONDS = float(os.environ.get('chat_storage_idle_ttl_seconds', '1800'))
+
+
+class SessionConversations:
+    """
+    Conversation dict for InMemoryChatStorage, grouped by user and session.
+    Sessions are evicted least-recently-used first once there are more than max_sessions,
+    and after idle_ttl_seconds without access. Safe to share between threads.
+    """
+
+    def __init__(self, max_sessions=MAX_SESSIONS, idle_ttl_seconds=SESSION_IDLE_TTL_SECONDS):
+        self.max_sessions = max_sessions
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self._sessions = OrderedDict()  # "user#session" -> {"last_access": t, "conversations": {key: messages}}
+        self._lock = threading.Lock()
+        self.stats = {"evicted_lru": 0, "evicted_idle": 0, "ended": 0}
+
+    @staticmethod
+    def _session_key(key):
+        # InMemoryChatStorage keys are "user_id#session_id#agent_id"
+        return key.rsplit('#', 1)[0]
+
+    def _evict(self, now):
+        while self._sessions:
+            session_key, session = next(iter(self._sessions.items()))
+            if now - session["last_access"] > self.idle_ttl_seconds:
+                self.stats["evicted_idle"] += 1
+            elif len(self._sessions) > self.max_sessions:
+                self.stats["evicted_lru"] += 1
+            else:
+                break
+            del self._sessions[session_key]
+
+    def _touch(self, key):
+        now = time.monotonic()
+        session_key = self._session_key(key)
+        session = self._sessions.get(session_key)
+        if session is None:
+            session = self._sessions[session_key] = {"last_access": now, "conversations": {}}
+        else:
+            self._sessions.move_to_end(session_key)
+            session["last_access"] = now
+        self._evict(now)
+        return session["conversations"]
+
+    def __getitem__(self, key):
+        with self._lock:
+            return self._touch(key).setdefault(key, [])
+
+    def __setitem__(self, key, messages):
+        with self._lock:
+            self._touch(key)[key] = messages
+
+    def items(self):
+        with self._lock:
+            return [item for session in self._sessions.values() for item in session["conversations"].items()]
+
+    def end_session(self, user_id, session_id):
+        with self._lock:
+            if self._sessions.pop(f"{user_id}#{session_id}", None) is not None:
+                self.stats["ended"] += 1
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+
+class SessionChatStorage(InMemoryChatStorage):
+    """InMemoryChatStorage with bounded, session-scoped conversations."""
+
+    def __init__(self, max_sessions=MAX_SESSIONS, idle_ttl_seconds=SESSION_IDLE_TTL_SECONDS):
+        super().__init__()
+        self.conversations = SessionConversations(max_sessions, idle_ttl_seconds)
+
+    def end_session(self, user_id, session_id):
+        """Drop a finished session's conversations right away instead of waiting for eviction."""
+        self.conversations.end_session(user_id, session_id)
+
+    def stats(self):
+        return {"sessions": len(self.conversations), **self.conversations.stats}
@@ -0,0 +1,107 @@
+import os
+import threading
+from collections import OrderedDict
+from agent_squad.agents import AgentResponse
+from agent_squad.classifiers import ClassifierResult
+from agent_squad.orchestrator import AgentSquad
+from agent_squad.types import ConversationMessage, ParticipantRole
+from agent_squad.utils import Logger
+
+# Keep the previous supervisor for follow-up turns instead of classifying every request
+STICKY_ROUTING = os.environ.get('sticky_routing', 'true').lower() == 'true'
+MAX_SESSIONS = int(os.environ.get('sticky_routing_max_sessions', '1000'))
+
+
+class StickyRouter:
+    """
+    Routes follow-up turns of a session straight to the supervisor that answered the previous
+    turn, and only runs the orchestrator's classifier when the topic-shift detector fires.
+
+    The detector is the orchestrator classifier's local predict() (see LocalPreClassifier):
+    a turn shifts topic when its text alone points to a different agent. Sessions are kept
+    by agent id, so one router can be shared by a pool of orchestrators.
+    """
+
+    def __init__(self, max_sessions=MAX_SESSIONS, enabled=STICKY_ROUTING):
+        self.max_sessions = max_sessions
+        self.enabled = enabled
+        self._last_agent_ids = OrderedDict()  # "user#session" -> agent id
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "shifts": 0}
+
+    def _last_agent(self, orchestrator: AgentSquad, session_key):
+        with self._lock:
+            agent_id = self._last_agent_ids.get(session_key)
+            if agent_id is not None:
+                self._last_agent_ids.move_to_end(session_key)
+        return orchestrator.agents.get(agent_id) if agent_id else None
+
+    def _remember(self, session_key, agent_id):
+        with self._lock:
+            self._last_agent_ids[session_key] = agent_id
+            self._last_agent_ids.move_to_end(session_key)
+            while len(self._last_agent_ids) > self.max_sessions:
+                self._last_agent_ids.popitem(last=False)
+
+    def end_session(self, user_id, session_id):
+        with self._lock:
+            self._last_agent_ids.pop(f"{user_id}#{session_id}", None)
+
+    @staticmethod
+    def topic_shift(orchestrator: AgentSquad, user_input: str, agent) -> bool:
+        predict = getattr(orchestrator.classifier, 'predict', None)
+        if predict is None:
+            # No cheap detector, so every turn may be a new topic
+            return True
+        prediction = predict(user_input)
+        return prediction is not None and prediction[0] != agent.name
+
+    def hit_rate(self):
+        total = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / total if total else 0.0
+
+    async def route_request(self,
+                            orchestrator: AgentSquad,
+                            user_input: str,
+                            user_id: str,
+                            session_id: str,
+                            additional_params: dict[str, str] | None = None,
+                            stream_response: bool | None = False) -> AgentResponse:
+        """AgentSquad.route_request, skipping classification for follow-ups on the same topic"""
+        if not self.enabled:
+            return await orchestrator.route_request(user_input, user_id, session_id, additional_params, stream_response)
+
+        session_key = f"{user_id}#{session_id}"
+        agent = self._last_agent(orchestrator, session_key)
+        if agent is not None and not self.topic_shift(orchestrator, user_input, agent):
+            self.stats["hits"] += 1
+            Logger.info(f"Sticky routing hit: {agent.name} (hit rate {self.hit_rate():.0%}, {self.stats})")
+            try:
+                return await orchestrator.agent_process_request(
+                    user_input,
+                    user_id,
+                    session_id,
+                    ClassifierResult(selected_agent=agent, confidence=1.0),
+                    additional_params,
+                    stream_response
+                )
+            except Exception as error:
+                # Same shape as AgentSquad.route_request errors
+                return AgentResponse(
+                    metadata=orchestrator.create_metadata(None, user_input, user_id, session_id, additional_params),
+                    output=ConversationMessage(
+                        role=ParticipantRole.ASSISTANT.value,
+                        content=[{'text': orchestrator.config.GENERAL_ROUTING_ERROR_MSG_MESSAGE or str(error)}]
+                    ),
+                    streaming=False
+                )
+
+        self.stats["misses"] += 1
+        if agent is not None:
+            self.stats["shifts"] += 1
+        response = await orchestrator.route_request(user_input, user_id, session_id, additional_params, stream_response)
+        if response.metadata.agent_id in orchestrator.agents:
+            self._remember(session_key, response.metadata.agent_id)
+        Logger.info(f"Sticky routing miss{' (topic shift)' if agent is not None else ''}: "
+                    f"{response.metadata.agent_name} (hit rate {self.hit_rate():.0%}, {self.stats})")
+        return response
@@ -15,6 +15,9 @@ import logging
 
 from wind_turbine_agents.turbine_supervisor_agent import supervisor as turbine_supervisor_agent
 from solar_panel_agents.solar_supervisor_agent import supervisor as solar_supervisor_agent
+from energy_agents.local_classifier import LocalPreClassifier
+from energy_agents.sticky_routing import StickyRouter
+from energy_agents.answer_cache import SemanticAnswerCache, with_answer_cache
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -32,7 +35,10 @@ custom_bedrock_classifier = BedrockClassifier(BedrockClassifierOptions(
     }
 ))
 
-orchestrator = AgentSquad(classifier=custom_bedrock_classifier,options=AgentSquadConfig(
+# Route confident requests locally and only ask the LLM classifier about the rest
+local_classifier = LocalPreClassifier(custom_bedrock_classifier)
+
+orchestrator = AgentSquad(classifier=local_classifier,options=AgentSquadConfig(
     LOG_AGENT_CHAT=True,
     LOG_CLASSIFIER_CHAT=True,
     LOG_EXECUTION_TIMES=True,
@@ -41,15 +47,22 @@ orchestrator = AgentSquad(classifier=custom_bedrock_classifier,options=AgentSqua
     MAX_MESSAGE_PAIRS_PER_AGENT=10,
 ))
 
-orchestrator.add_agent(turbine_supervisor_agent)
-orchestrator.add_agent(solar_supervisor_agent)
+# Repeated knowledge-base questions are answered from memory, per supervisor and knowledge base version
+answer_cache = SemanticAnswerCache()
+
+orchestrator.add_agent(with_answer_cache(turbine_supervisor_agent, answer_cache))
+orchestrator.add_agent(with_answer_cache(solar_supervisor_agent, answer_cache))
+
+# Keeps the supervisor of the previous turn for follow-ups
+sticky_router = StickyRouter()
 
 async def handle_request(_orchestrator: AgentSquad, _user_input:str, _user_id:str, _session_id:str):
     # classifier_result=ClassifierResult(selected_agent=supervisor, confidence=1.0)
 
     # response:AgentResponse = await _orchestrator.agent_process_request(_user_input, _user_id, _session_id, classifier_result, {}, True)
 
-    response:AgentResponse = await _orchestrator.route_request(
+    response:AgentResponse = await sticky_router.route_request(
+        _orchestrator,
         _user_input,
         _user_id,
         _session_id
@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Callable
 import sys, asyncio, uuid
 import os
 from datetime import datetime, timezone
@@ -7,54 +7,123 @@ from agent_squad.agents import SupervisorAgent, SupervisorAgentOptions, AgentRes
 from agent_squad.classifiers import BedrockClassifier, BedrockClassifierOptions
 from agent_squad.classifiers import ClassifierResult
 from agent_squad.types import ConversationMessage
-from agent_squad.storage import InMemoryChatStorage
 from agent_squad.orchestrator import AgentSquad, AgentSquadConfig
 import json
 from typing import List, Optional, Dict
 import logging
+import queue
+import threading
 
-from wind_turbine_agents.turbine_supervisor_agent import supervisor as turbine_supervisor_agent
-from solar_panel_agents.solar_supervisor_agent import supervisor as solar_supervisor_agent
+from wind_turbine_agents.turbine_supervisor_agent import create_supervisor as create_turbine_supervisor_agent
+from solar_panel_agents.solar_supervisor_agent import create_supervisor as create_solar_supervisor_agent
+from energy_agents.session_storage import SessionChatStorage
+from energy_agents.local_classifier import LocalPreClassifier
+from energy_agents.sticky_routing import StickyRouter
+from energy_agents.answer_cache import SemanticAnswerCache, with_answer_cache
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
-memory_storage = InMemoryChatStorage()
-
-custom_bedrock_classifier = BedrockClassifier(BedrockClassifierOptions(
-        model_id=os.environ.get('turbine_solar_sonic_classifier_agent_llm', 'amazon.nova-pro-v1:0'),
-        region='us-east-1',
-        inference_config={
-            'maxTokens': 2048,
-            'temperature': 0.7,
-            'topP': 0.9
-        }
+# Conversations of all voice sessions, bounded by LRU and idle TTL eviction
+memory_storage = SessionChatStorage()
+
+# Repeated knowledge-base questions are answered from memory, shared by the whole pool
+answer_cache = SemanticAnswerCache()
+
+ORCHESTRATOR_POOL_SIZE = int(os.environ.get('sonic_orchestrator_pool_size', '4'))
+# How long a request waits for a free orchestrator before giving up; below the voice tool timeout
+ORCHESTRATOR_WAIT_SECONDS = float(os.environ.get('sonic_orchestrator_wait_seconds', '10'))
+ORCHESTRATOR_BUSY_MESSAGE = "All agents are busy right now. Please try again in a moment."
+# How often a request checks whether its voice session has given up on it
+CANCEL_POLL_SECONDS = float(os.environ.get('sonic_cancel_poll_seconds', '0.2'))
+
+def create_orchestrator():
+    """Build an orchestrator with its own classifier and supervisors, sharing the session storage"""
+    custom_bedrock_classifier = BedrockClassifier(BedrockClassifierOptions(
+            model_id=os.environ.get('turbine_solar_sonic_classifier_agent_llm', 'amazon.nova-pro-v1:0'),
+            region='us-east-1',
+            inference_config={
+                'maxTokens': 2048,
+                'temperature': 0.7,
+                'topP': 0.9
+            }
+        ))
+
+    # Route confident requests locally and only ask the LLM classifier about the rest
+    orchestrator = AgentSquad(classifier=LocalPreClassifier(custom_bedrock_classifier), storage=memory_storage, options=AgentSquadConfig(
+        LOG_AGENT_CHAT=True,
+        LOG_CLASSIFIER_CHAT=True,
+        LOG_EXECUTION_TIMES=True,
+        MAX_RETRIES=3,
+        USE_DEFAULT_AGENT_IF_NONE_IDENTIFIED=True,
+        MAX_MESSAGE_PAIRS_PER_AGENT=10,
     ))
 
-orchestrator = AgentSquad(classifier=custom_bedrock_classifier,options=AgentSquadConfig(
-    LOG_AGENT_CHAT=True,
-    LOG_CLASSIFIER_CHAT=True,
-    LOG_EXECUTION_TIMES=True,
-    MAX_RETRIES=3,
-    USE_DEFAULT_AGENT_IF_NONE_IDENTIFIED=True,
-    MAX_MESSAGE_PAIRS_PER_AGENT=10,
-))
+    orchestrator.add_agent(with_answer_cache(create_turbine_supervisor_agent(memory_storage), answer_cache))
+    orchestrator.add_agent(with_answer_cache(create_solar_supervisor_agent(memory_storage), answer_cache))
+    return orchestrator
+
+# Warm orchestrators; the classifier and supervisors keep per-request state, so each request checks one out
+orchestrator_pool = queue.Queue()
+for _ in range(ORCHESTRATOR_POOL_SIZE):
+    orchestrator_pool.put(create_orchestrator())
+
+# Shared by the pool, so a session's follow-ups stay with its supervisor whichever orchestrator serves them
+sticky_router = StickyRouter()
 
-orchestrator.add_agent(turbine_supervisor_agent)
-orchestrator.add_agent(solar_supervisor_agent)
+def end_session(_user_id:str, _session_id:str):
+    """Release a finished voice session's conversation history"""
+    memory_storage.end_session(_user_id, _session_id)
+    sticky_router.end_session(_user_id, _session_id)
 
 # USER_ID = str(uuid.uuid4())
 # SESSION_ID = str(uuid.uuid4())
 
-async def handle_request(_user_input:str, _user_id:str, _session_id:str):
+async def handle_request(_user_input:str, _user_id:str, _session_id:str, on_chunk:Optional[Callable[[str], None]]=None,
+                         additional_params:Optional[Dict[str, Any]]=None, cancel:Optional[threading.Event]=None):
+    # Blocks the calling worker thread until an orchestrator is free, but never indefinitely
+    try:
+        orchestrator = orchestrator_pool.get(timeout=ORCHESTRATOR_WAIT_SECONDS)
+    except queue.Empty:
+        logger.warning(f"No orchestrator free after {ORCHESTRATOR_WAIT_SECONDS}s, failing the request")
+        return ORCHESTRATOR_BUSY_MESSAGE
+    try:
+        request = _handle_request(orchestrator, _user_input, _user_id, _session_id, on_chunk, additional_params, cancel)
+        return await (_run_until_cancelled(request, cancel) if cancel else request)
+    finally:
+        orchestrator_pool.put(orchestrator)
+
+async def _run_until_cancelled(request, cancel:threading.Event):
+    """Run the request, cancelling it at its next await once cancel is set. A model or agent call
+    already in flight (including supervisor team calls on their own threads) still runs to completion,
+    so the caller's worker thread and the orchestrator are only released after that call returns."""
+    task = asyncio.ensure_future(request)
+    while not task.done():
+        if cancel.is_set():
+            logger.info("Request cancelled by its session")
+            task.cancel()
+            break
+        await asyncio.wait({task}, timeout=CANCEL_POLL_SECONDS)
+    try:
+        return await task
+    except asyncio.CancelledError:
+        return None
+
+async def _handle_request(orchestrator:AgentSquad, _user_input:str, _user_id:str, _session_id:str, on_chunk:Optional[Callable[[str], None]]=None,
+                          additional_params:Optional[Dict[str, Any]]=None, cancel:Optional[threading.Event]=None):
     # classifier_result=ClassifierResult(selected_agent=supervisor, confidence=1.0)
 
     # response:AgentResponse = await _orchestrator.agent_process_request(_user_input, _user_id, _session_id, classifier_result, {}, True)
 
-    response:AgentResponse = await orchestrator.route_request(
+    # With on_chunk, ask for a streamed response and hand each partial text to the caller as it arrives.
+    # additional_params reach the team agents, e.g. sessionState for the Bedrock catalog agent
+    response:AgentResponse = await sticky_router.route_request(
+        orchestrator,
         _user_input,
         _user_id,
-        _session_id
+        _session_id,
+        additional_params or {},
+        on_chunk is not None
     )
 
     logger.info(f"response: {response}")
@@ -72,6 +141,22 @@ async def handle_request(_user_input:str, _user_id:str, _session_id:str):
         elif isinstance(response.output, ConversationMessage):
                 print(f"\033[34m{response.output.content[0].get('text')}\033[0m")
                 final_response = response.output.content[0].get('text')
+        elif response.streaming:
+            # Agents without streaming support still return a complete message
+            chunks = []
+            async for chunk in response.output:
+                # Stop reading the model stream, and so stop further lead agent turns, once cancelled
+                if cancel is not None and cancel.is_set():
+                    break
+                text = chunk.text if isinstance(chunk, AgentStreamResponse) else str(chunk)
+                if text:
+                    chunks.append(text)
+                    if on_chunk:
+                        on_chunk(text)
+                if isinstance(chunk, AgentStreamResponse) and chunk.final_message:
+                    chunks = [chunk.final_message.content[0].get('text')]
+            final_response = "".join(chunks)
+            print(f"\033[34m{final_response}\033[0m")
 
     return final_response
 
@@ -131,8 +216,8 @@ if __name__ == "__main__":
     # orchestrator.add_agent(turbine_supervisor_agent)
     # orchestrator.add_agent(solar_supervisor_agent)
 
-    # USER_ID = str(uuid.uuid4())
-    # SESSION_ID = str(uuid.uuid4())
+    USER_ID = str(uuid.uuid4())
+    SESSION_ID = str(uuid.uuid4())
 
     while True:
         # Get user input
@@ -144,5 +229,5 @@ if __name__ == "__main__":
 
         # Run async function to process user input
         if user_input:
-            asyncio.run(handle_request(orchestrator, user_input, USER_ID, SESSION_ID))
+            asyncio.run(handle_request(user_input, USER_ID, SESSION_ID))
     
\ No newline at end of file
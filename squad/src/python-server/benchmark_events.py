@@ -0,0 +1,53 @@
+"""Micro-benchmark for the per-chunk S2S event serialization path.
+
+Compares the original path (build the nested event dict, json.dumps it, encode it) with
+the codec and pre-serialized templates, for audio input sent to Bedrock and audio output
+forwarded to the client. Run it with and without orjson installed:
+
+    python benchmark_events.py --events 200000
+"""
+import argparse
+import base64
+import json
+import os
+import time
+import uuid
+
+from s2s_codec import CODEC_NAME, dumps, dumps_bytes
+from s2s_events import S2sEvent
+
+
+def events_per_second(func, events):
+    start = time.perf_counter()
+    for _ in range(events):
+        func()
+    return events / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark S2S event serialization')
+    parser.add_argument('--events', type=int, default=100000)
+    parser.add_argument('--chunk-bytes', type=int, default=1024, help='PCM bytes per audio chunk')
+    args = parser.parse_args()
+
+    prompt_name, content_name = str(uuid.uuid4()), str(uuid.uuid4())
+    content = base64.b64encode(os.urandom(args.chunk_bytes)).decode('utf-8')
+    audio_output = {"event": {"audioOutput": {"contentId": content_name, "content": content}}, "timestamp": 0}
+
+    cases = {
+        "audioInput  dict + json.dumps": lambda: json.dumps(S2sEvent.audio_input(prompt_name, content_name, content)).encode('utf-8'),
+        f"audioInput  dict + {CODEC_NAME}": lambda: dumps_bytes(S2sEvent.audio_input(prompt_name, content_name, content)),
+        "audioInput  template": lambda: S2sEvent.audio_input_bytes(prompt_name, content_name, content),
+        "contentEnd  dict + json.dumps": lambda: json.dumps(S2sEvent.content_end(prompt_name, content_name)).encode('utf-8'),
+        "contentEnd  template": lambda: S2sEvent.content_end_bytes(prompt_name, content_name),
+        "audioOutput json.dumps": lambda: json.dumps(audio_output),
+        f"audioOutput {CODEC_NAME}": lambda: dumps(audio_output),
+    }
+
+    print(f"codec={CODEC_NAME} events={args.events} chunk_bytes={args.chunk_bytes}")
+    for name, func in cases.items():
+        print(f"{name:<32} {events_per_second(func, args.events):>12,.0f} events/sec")
+
+
+if __name__ == '__main__':
+    main()
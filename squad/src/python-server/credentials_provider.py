@@ -0,0 +1,125 @@
+import asyncio
+import os
+import threading
+import time
+
+from smithy_aws_core.identity import AWSCredentialsIdentity
+
+from client_factory import get_client
+
+# Refresh the STS session token this long before it expires
+REFRESH_MARGIN_SECONDS = int(os.environ.get("CREDENTIALS_REFRESH_MARGIN_SECONDS", "600"))
+SESSION_DURATION_SECONDS = int(os.environ.get("CREDENTIALS_SESSION_DURATION_SECONDS", "7200"))
+
+
+class SessionCredentialsProvider:
+    """Process-wide cache of STS session credentials shared by all S2S sessions"""
+
+    def __init__(self, aws_key, aws_secret, region, logger=None):
+        self.aws_key = aws_key
+        self.aws_secret = aws_secret
+        self.region = region
+        self.logger = logger
+
+        self._credentials = None
+        self._lock = threading.Lock()
+        self._refresh_task = None
+        self.stats = {"sts_calls": 0, "cache_hits": 0}
+
+        # A session token already in the environment is used as-is and never refreshed
+        if os.environ.get("AWS_SESSION_TOKEN"):
+            self._credentials = {
+                "AccessKeyId": os.environ.get("AWS_ACCESS_KEY_ID", aws_key),
+                "SecretAccessKey": os.environ.get("AWS_SECRET_ACCESS_KEY", aws_secret),
+                "SessionToken": os.environ["AWS_SESSION_TOKEN"],
+                "Expiration": None,
+            }
+
+    def _is_fresh(self):
+        if not self._credentials:
+            return False
+        expiration = self._credentials["Expiration"]
+        return expiration is None or expiration.timestamp() - time.time() > REFRESH_MARGIN_SECONDS
+
+    def _refresh(self):
+        """Fetch a new session token from STS"""
+        sts_client = get_client(
+            'sts',
+            aws_access_key_id=self.aws_key,
+            aws_secret_access_key=self.aws_secret,
+            region_name=self.region,
+        )
+        response = sts_client.get_session_token(DurationSeconds=SESSION_DURATION_SECONDS)
+        self.stats["sts_calls"] += 1
+        self._credentials = response['Credentials']
+        if self.logger:
+            self.logger.info(f"Refreshed STS session credentials, expiring at {self._credentials['Expiration']}")
+
+    def get_credentials(self):
+        """Return cached credentials, refreshing them first if they are close to expiry"""
+        if self._is_fresh():
+            self.stats["cache_hits"] += 1
+            return self._credentials
+        with self._lock:
+            # Another caller may have refreshed while we waited for the lock
+            if not self._is_fresh():
+                self._refresh()
+            return self._credentials
+
+    async def get_credentials_async(self):
+        """Return cached credentials without blocking the event loop on an STS call"""
+        self._ensure_background_refresh()
+        if self._is_fresh():
+            self.stats["cache_hits"] += 1
+            return self._credentials
+        return await asyncio.to_thread(self.get_credentials)
+
+    def _ensure_background_refresh(self):
+        if self._credentials and self._credentials["Expiration"] is None:
+            return
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.get_running_loop().create_task(self._background_refresh())
+
+    async def _background_refresh(self):
+        """Refresh the token shortly before it expires so sessions never wait on STS"""
+        while True:
+            try:
+                if self._credentials:
+                    expires_in = self._credentials["Expiration"].timestamp() - time.time()
+                    await asyncio.sleep(max(0, expires_in - REFRESH_MARGIN_SECONDS))
+                await asyncio.to_thread(self.get_credentials)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"Background credentials refresh failed: {e}")
+                await asyncio.sleep(30)
+
+
+class ProviderCredentialsResolver:
+    """Smithy identity resolver backed by a SessionCredentialsProvider instead of the environment"""
+
+    def __init__(self, provider):
+        self.provider = provider
+
+    async def get_identity(self, **kwargs):
+        credentials = await self.provider.get_credentials_async()
+        return AWSCredentialsIdentity(
+            access_key_id=credentials["AccessKeyId"],
+            secret_access_key=credentials["SecretAccessKey"],
+            session_token=credentials["SessionToken"],
+            expiration=credentials["Expiration"],
+        )
+
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+def get_credentials_provider(aws_key, aws_secret, region, logger=None):
+    """Return the process-wide credentials provider for the given key and region"""
+    with _providers_lock:
+        key = (aws_key, region)
+        if key not in _providers:
+            _providers[key] = SessionCredentialsProvider(aws_key, aws_secret, region, logger)
+        return _providers[key]
@@ -0,0 +1,144 @@
+"""Offline stand-in for the Nova Sonic bidirectional stream, used by the S2S load test.
+
+It mimics the parts of the aws_sdk_bedrock_runtime stream that S2sSessionManager uses
+(input_stream.send/close and await_output().receive()) and answers each user turn with a
+scripted sequence: the user transcript, an optional getDateTool toolUse, then assistant
+audio and text. A turn ends when no audio has arrived for FAKE_BEDROCK_ENDPOINT_MS, like
+the service's voice activity detection. Enable it with S2S_BEDROCK_BACKEND=fake.
+"""
+import asyncio
+import base64
+import json
+import os
+import uuid
+from types import SimpleNamespace
+
+ENDPOINT_MS = float(os.environ.get("FAKE_BEDROCK_ENDPOINT_MS", "300"))
+FIRST_BYTE_MS = float(os.environ.get("FAKE_BEDROCK_FIRST_BYTE_MS", "150"))
+# Every Nth turn calls getDateTool before answering; 0 disables tool use
+TOOL_EVERY_N_TURNS = int(os.environ.get("FAKE_BEDROCK_TOOL_EVERY_N_TURNS", "3"))
+AUDIO_OUTPUT_CHUNKS = int(os.environ.get("FAKE_BEDROCK_AUDIO_OUTPUT_CHUNKS", "25"))
+# 24 kHz 16-bit mono, 40 ms per chunk, streamed at real-time pace
+AUDIO_OUTPUT_CHUNK_BYTES = 1920
+AUDIO_OUTPUT_CHUNK_SECONDS = 0.04
+
+_SILENCE = base64.b64encode(bytes(AUDIO_OUTPUT_CHUNK_BYTES)).decode("ascii")
+_CLOSED = object()
+
+
+class _OutputStream:
+    def __init__(self, queue):
+        self.queue = queue
+
+    async def receive(self):
+        event = await self.queue.get()
+        if event is _CLOSED:
+            raise StopAsyncIteration("Fake stream closed")
+        return SimpleNamespace(value=SimpleNamespace(bytes_=json.dumps(event).encode("utf-8")))
+
+
+class _InputStream:
+    def __init__(self, stream):
+        self.stream = stream
+
+    async def send(self, chunk):
+        self.stream.on_input(json.loads(chunk.value.bytes_))
+
+    async def close(self):
+        self.stream.close()
+
+
+class FakeBidirectionalStream:
+    """Scripted Nova Sonic conversation driven by the input events it receives."""
+
+    def __init__(self):
+        self.input_stream = _InputStream(self)
+        self._output = asyncio.Queue()
+        self._output_stream = _OutputStream(self._output)
+        self.prompt_name = None
+        self.turns = 0
+        self._turn_timer = None
+        self._turn_task = None
+        self._tool_waiters = {}      # toolUseId -> future for the tool result
+        self._tool_contents = {}     # tool result contentName -> toolUseId
+        self.closed = False
+
+    async def await_output(self):
+        return None, self._output_stream
+
+    def emit(self, event_name, body):
+        if not self.closed:
+            self._output.put_nowait({"event": {event_name: {"promptName": self.prompt_name, **body}}})
+
+    def on_input(self, event):
+        event_name, body = next(iter(event["event"].items()))
+        if event_name == "promptStart":
+            self.prompt_name = body["promptName"]
+        elif event_name == "audioInput":
+            # Restart the end-of-turn timer on every chunk
+            if self._turn_timer:
+                self._turn_timer.cancel()
+            self._turn_timer = asyncio.get_running_loop().call_later(ENDPOINT_MS / 1000, self._end_turn)
+        elif event_name == "contentStart" and body.get("type") == "TOOL":
+            self._tool_contents[body["contentName"]] = body["toolResultInputConfiguration"]["toolUseId"]
+        elif event_name == "toolResult":
+            waiter = self._tool_waiters.pop(self._tool_contents.pop(body["contentName"], None), None)
+            if waiter and not waiter.done():
+                waiter.set_result(body["content"])
+        elif event_name == "sessionEnd":
+            self.close()
+
+    def _end_turn(self):
+        self._turn_timer = None
+        if self._turn_task is None or self._turn_task.done():
+            self.turns += 1
+            self._turn_task = asyncio.get_running_loop().create_task(self._respond(self.turns))
+
+    async def _text(self, role, content):
+        content_id = str(uuid.uuid4())
+        self.emit("contentStart", {"contentId": content_id, "type": "TEXT", "role": role})
+        self.emit("textOutput", {"contentId": content_id, "role": role, "content": content})
+        self.emit("contentEnd", {"contentId": content_id, "type": "TEXT", "stopReason": "END_TURN"})
+
+    async def _use_tool(self):
+        content_id, tool_use_id = str(uuid.uuid4()), str(uuid.uuid4())
+        result = asyncio.get_running_loop().create_future()
+        self._tool_waiters[tool_use_id] = result
+        self.emit("contentStart", {"contentId": content_id, "type": "TOOL", "role": "TOOL"})
+        self.emit("toolUse", {"contentId": content_id, "toolUseId": tool_use_id, "toolName": "getDateTool",
+                              "content": json.dumps({"query": "what day is it"})})
+        self.emit("contentEnd", {"contentId": content_id, "type": "TOOL", "stopReason": "TOOL_USE"})
+        try:
+            await asyncio.wait_for(result, timeout=30)
+        except asyncio.TimeoutError:
+            self._tool_waiters.pop(tool_use_id, None)
+
+    async def _respond(self, turn):
+        await self._text("USER", f"scripted user turn {turn}")
+        if TOOL_EVERY_N_TURNS and turn % TOOL_EVERY_N_TURNS == 0:
+            await self._use_tool()
+        await asyncio.sleep(FIRST_BYTE_MS / 1000)
+
+        content_id = str(uuid.uuid4())
+        self.emit("contentStart", {"contentId": content_id, "type": "AUDIO", "role": "ASSISTANT"})
+        for _ in range(AUDIO_OUTPUT_CHUNKS):
+            self.emit("audioOutput", {"contentId": content_id, "role": "ASSISTANT", "content": _SILENCE})
+            await asyncio.sleep(AUDIO_OUTPUT_CHUNK_SECONDS)
+        self.emit("contentEnd", {"contentId": content_id, "type": "AUDIO", "stopReason": "END_TURN"})
+        await self._text("ASSISTANT", f"scripted assistant answer {turn}")
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        for handle in (self._turn_timer, self._turn_task):
+            if handle:
+                handle.cancel()
+        self._output.put_nowait(_CLOSED)
+
+
+class FakeBedrockRuntimeClient:
+    """Drop-in for BedrockRuntimeClient that opens FakeBidirectionalStreams."""
+
+    async def invoke_model_with_bidirectional_stream(self, operation_input):
+        return FakeBidirectionalStream()
@@ -0,0 +1,138 @@
+"""Run the S2S WebSocket server as several worker processes sharing one listening port.
+
+Each worker is a full server.py event loop bound with SO_REUSEPORT, so the kernel spreads
+new voice sessions across workers and the JSON/base64 hot loops use every core. The
+launcher serves one aggregated health endpoint, restarts workers that die, and on
+SIGTERM/SIGINT lets every worker drain its open sessions before exiting.
+
+    S2S_WORKERS=4 python launcher.py
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+
+import server
+
+S2S_WORKERS = int(os.environ.get("S2S_WORKERS", os.cpu_count() or 1))
+# A worker that hasn't reported for this long is considered unhealthy
+HEARTBEAT_TIMEOUT_SECONDS = float(os.environ.get("WORKER_HEARTBEAT_TIMEOUT_SECONDS", "5"))
+# Metrics are per process: when set, worker N serves /health and /metrics on localhost:<base + N>
+WORKER_METRICS_PORT_BASE = os.environ.get("WORKER_METRICS_PORT_BASE")
+
+logger = logging.getLogger(__name__)
+
+
+def run_worker(worker_id, sessions, heartbeats, draining):
+    """Worker process entry point: run the WebSocket server on the shared port."""
+    def report(session_count, is_draining):
+        sessions[worker_id] = session_count
+        draining[worker_id] = is_draining
+        heartbeats[worker_id] = time.time()
+
+    if WORKER_METRICS_PORT_BASE:
+        server.start_health_check_server("127.0.0.1", int(WORKER_METRICS_PORT_BASE) + worker_id)
+    asyncio.run(server.main(server.HOST, server.WS_PORT, None, reuse_port=True, report=report))
+
+
+class WorkerPool:
+    """Starts, supervises and drains the worker processes."""
+
+    def __init__(self, worker_count):
+        self.context = multiprocessing.get_context("spawn")
+        self.worker_count = worker_count
+        self.sessions = self.context.Array('i', worker_count)
+        self.heartbeats = self.context.Array('d', worker_count)
+        self.draining = self.context.Array('b', worker_count)
+        self.processes = {}
+        self.stopping = threading.Event()
+
+    def start_worker(self, worker_id):
+        self.sessions[worker_id], self.draining[worker_id], self.heartbeats[worker_id] = 0, False, time.time()
+        process = self.context.Process(target=run_worker, name=f"s2s-worker-{worker_id}",
+                                       args=(worker_id, self.sessions, self.heartbeats, self.draining))
+        process.start()
+        self.processes[worker_id] = process
+        logger.info(f"Started worker {worker_id} (pid {process.pid})")
+
+    def status(self):
+        """Aggregated health of all workers, served on the health port."""
+        now = time.time()
+        workers = []
+        for worker_id, process in self.processes.items():
+            workers.append({
+                "worker": worker_id,
+                "pid": process.pid,
+                "alive": process.is_alive(),
+                "sessions": self.sessions[worker_id],
+                "draining": bool(self.draining[worker_id]),
+                "heartbeat_age_seconds": round(now - self.heartbeats[worker_id], 1),
+                "metrics_port": int(WORKER_METRICS_PORT_BASE) + worker_id if WORKER_METRICS_PORT_BASE else None,
+            })
+        healthy = [worker for worker in workers if worker["alive"] and not worker["draining"]
+                   and worker["heartbeat_age_seconds"] < HEARTBEAT_TIMEOUT_SECONDS]
+        if self.stopping.is_set():
+            status = "draining"
+        else:
+            status = "healthy" if healthy else "unhealthy"
+        return {
+            "status": status,
+            "pid": os.getpid(),
+            "sessions": sum(worker["sessions"] for worker in workers),
+            "healthy_workers": len(healthy),
+            "workers": workers,
+        }
+
+    def supervise(self):
+        """Restart workers that exit unexpectedly until a shutdown is requested."""
+        while not self.stopping.wait(1):
+            for worker_id, process in list(self.processes.items()):
+                if not process.is_alive():
+                    logger.warning(f"Worker {worker_id} (pid {process.pid}) exited with {process.exitcode}, restarting")
+                    self.start_worker(worker_id)
+
+    def shutdown(self, drain_timeout):
+        """Ask every worker to drain, then stop any that outlive the drain timeout."""
+        for process in self.processes.values():
+            if process.is_alive():
+                os.kill(process.pid, signal.SIGTERM)
+
+        deadline = time.monotonic() + drain_timeout
+        for worker_id, process in self.processes.items():
+            process.join(max(0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning(f"Worker {worker_id} (pid {process.pid}) did not drain in time, killing it")
+                process.kill()
+                process.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Nova S2S WebSocket Server (multi-process)')
+    parser.add_argument('--workers', type=int, default=S2S_WORKERS, help='Number of worker processes')
+    args = parser.parse_args()
+
+    pool = WorkerPool(args.workers)
+    for worker_id in range(args.workers):
+        pool.start_worker(worker_id)
+
+    if server.HEALTH_PORT:
+        server.start_health_check_server(server.HOST, server.HEALTH_PORT, status_provider=pool.status)
+
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: pool.stopping.set())
+
+    print(f"Started {args.workers} S2S workers on {server.HOST}:{server.WS_PORT}")
+    pool.supervise()
+
+    print("Draining S2S workers")
+    # Leave the workers their own drain window plus time to close the stream cleanly
+    pool.shutdown(server.DRAIN_TIMEOUT_SECONDS + 5)
+    print("All S2S workers stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import struct
+
+# Optional WebSocket sub-protocol: audio travels as raw PCM frames, control events stay JSON.
+#
+# Frame layout (network byte order):
+#   1 byte   frame type (AUDIO_INPUT_FRAME or AUDIO_OUTPUT_FRAME)
+#   1 byte   length N of the content name / content id
+#   N bytes  content name (input) or content id (output), UTF-8
+#   rest     16-bit little-endian LPCM samples
+BINARY_AUDIO_SUBPROTOCOL = "s2s-binary-audio-v1"
+
+AUDIO_INPUT_FRAME = 0x01
+AUDIO_OUTPUT_FRAME = 0x02
+
+_HEADER = struct.Struct("!BB")
+# The name length is a single byte
+MAX_CONTENT_NAME_BYTES = 255
+
+
+def encode_audio_frame(frame_type, content_name, pcm):
+    """Build a binary audio frame; raises ValueError for a content name over MAX_CONTENT_NAME_BYTES."""
+    name = content_name.encode("utf-8")
+    if len(name) > MAX_CONTENT_NAME_BYTES:
+        raise ValueError(f"Content name is {len(name)} bytes; binary audio frames allow at most {MAX_CONTENT_NAME_BYTES}")
+    return _HEADER.pack(frame_type, len(name)) + name + pcm
+
+
+def decode_audio_frame(frame):
+    """Split a binary audio frame into (frame_type, content_name, pcm)."""
+    if len(frame) < _HEADER.size:
+        raise ValueError("Audio frame is shorter than its header")
+    frame_type, name_length = _HEADER.unpack_from(frame)
+    name_end = _HEADER.size + name_length
+    if len(frame) < name_end:
+        raise ValueError("Audio frame is shorter than its content name")
+    content_name = bytes(frame[_HEADER.size:name_end]).decode("utf-8")
+    return frame_type, content_name, memoryview(frame)[name_end:]
@@ -0,0 +1,34 @@
+import json
+
+# orjson is optional; the stdlib json module is used when it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+CODEC_NAME = "orjson" if orjson else "json"
+
+
+def dumps_bytes(obj):
+    """Serialize an event to UTF-8 JSON bytes."""
+    if orjson:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def dumps(obj):
+    """Serialize an event to a JSON string, for WebSocket text frames."""
+    if orjson:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, separators=(",", ":"))
+
+
+def loads(data):
+    """Parse a JSON event from bytes or str."""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Both codecs raise a ValueError subclass on malformed input
+DecodeError = orjson.JSONDecodeError if orjson else json.JSONDecodeError
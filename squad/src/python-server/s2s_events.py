@@ -1,4 +1,6 @@
 import json
+from functools import lru_cache
+from s2s_codec import dumps_bytes
 
 class S2sEvent:
   
@@ -26,6 +28,36 @@ class S2sEvent:
       }
     }
   
+  # Pre-serialized hot-path events: the static JSON around the payload is built once per
+  # prompt/content name and only the base64 payload is spliced in per chunk
+  @staticmethod
+  @lru_cache(maxsize=256)
+  def _audio_input_template(prompt_name, content_name):
+    marker = "\u0000payload\u0000"
+    encoded = dumps_bytes(S2sEvent.audio_input(prompt_name, content_name, marker))
+    prefix, suffix = encoded.split(dumps_bytes(marker))
+    return prefix + b'"', b'"' + suffix
+
+  @staticmethod
+  def audio_input_bytes(prompt_name, content_name, content):
+    """Serialized audioInput event; content must be base64 text, which needs no JSON escaping."""
+    prefix, suffix = S2sEvent._audio_input_template(prompt_name, content_name)
+    if isinstance(content, str):
+      content = content.encode("ascii")
+    return b"".join((prefix, content, suffix))
+
+  @staticmethod
+  @lru_cache(maxsize=256)
+  def _content_end_template(prompt_name):
+    marker = "\u0000name\u0000"
+    return tuple(dumps_bytes(S2sEvent.content_end(prompt_name, marker)).split(dumps_bytes(marker)))
+
+  @staticmethod
+  def content_end_bytes(prompt_name, content_name):
+    """Serialized contentEnd event; content names vary per block, so only the prompt part is cached."""
+    prefix, suffix = S2sEvent._content_end_template(prompt_name)
+    return b"".join((prefix, dumps_bytes(content_name), suffix))
+
   @staticmethod
   def content_start_tool(prompt_name, content_name, tool_use_id):
     return {
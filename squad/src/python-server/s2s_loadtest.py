@@ -0,0 +1,289 @@
+"""Offline load test for the S2S WebSocket server.
+
+Starts server.py against the scripted stream in fake_bedrock_stream.py (no AWS access is
+needed), opens N concurrent WebSocket clients that replay audioInput events at real-time
+pace, and reports end-to-end latency, event throughput and server CPU/memory per session:
+
+    python s2s_loadtest.py --sessions 50 --turns 5
+    python s2s_loadtest.py --sessions 20 --recording recorded_events.jsonl --json report.json
+
+End-to-end latency is measured from the last audio chunk of a user turn to the first
+assistant audioOutput, so it includes the fake backend's end-of-turn detection
+(FAKE_BEDROCK_ENDPOINT_MS) and model delay (FAKE_BEDROCK_FIRST_BYTE_MS). A recording is a
+JSON Lines file of client events; its audioInput contents are replayed as one user turn.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import uuid
+
+import websockets
+
+# 512 samples of 16 kHz 16-bit mono per chunk, as the browser client sends them
+CHUNK_SECONDS = 0.032
+SYNTHETIC_CHUNK = base64.b64encode(bytes(1024)).decode("ascii")
+
+TOOL_CONFIG = {
+    "tools": [{
+        "toolSpec": {
+            "name": "getDateTool",
+            "description": "Get the current date and time",
+            "inputSchema": {"json": json.dumps({"type": "object", "properties": {}, "required": []})}
+        }
+    }]
+}
+
+
+def load_recording(path):
+    """audioInput contents from a JSON Lines recording of client events."""
+    chunks = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                audio_input = json.loads(line).get("event", {}).get("audioInput")
+                if audio_input:
+                    chunks.append(audio_input["content"])
+    if not chunks:
+        raise ValueError(f"No audioInput events in {path}")
+    return chunks
+
+
+def session_setup_events(prompt_name, system_content, audio_content):
+    return [
+        {"event": {"sessionStart": {"inferenceConfiguration": {"maxTokens": 1024, "topP": 0.95, "temperature": 0.7}}}},
+        {"event": {"promptStart": {"promptName": prompt_name, "textOutputConfiguration": {"mediaType": "text/plain"},
+                                   "toolUseOutputConfiguration": {"mediaType": "application/json"},
+                                   "toolConfiguration": TOOL_CONFIG}}},
+        {"event": {"contentStart": {"promptName": prompt_name, "contentName": system_content, "type": "TEXT",
+                                    "interactive": True, "role": "SYSTEM",
+                                    "textInputConfiguration": {"mediaType": "text/plain"}}}},
+        {"event": {"textInput": {"promptName": prompt_name, "contentName": system_content,
+                                 "content": "You are a load test assistant."}}},
+        {"event": {"contentEnd": {"promptName": prompt_name, "contentName": system_content}}},
+        {"event": {"contentStart": {"promptName": prompt_name, "contentName": audio_content, "type": "AUDIO",
+                                    "interactive": True, "role": "USER",
+                                    "audioInputConfiguration": {"mediaType": "audio/lpcm", "sampleRateHertz": 16000,
+                                                                "sampleSizeBits": 16, "channelCount": 1,
+                                                                "audioType": "SPEECH", "encoding": "base64"}}}},
+    ]
+
+
+class SessionResult:
+    def __init__(self):
+        self.latencies = []
+        self.sent = 0
+        self.received = 0
+        self.timeouts = 0
+        self.error = None
+
+
+async def run_session(url, chunks, turns, turn_timeout, result):
+    """One simulated voice client: set up a prompt, then speak `turns` times and wait for each answer."""
+    prompt_name, system_content, audio_content = (str(uuid.uuid4()) for _ in range(3))
+    turn_sent_at = None
+    answered = asyncio.Event()
+
+    async def receive(websocket):
+        nonlocal turn_sent_at
+        async for message in websocket:
+            result.received += 1
+            event = json.loads(message).get("event", {})
+            if "audioOutput" in event and turn_sent_at is not None:
+                result.latencies.append(time.monotonic() - turn_sent_at)
+                turn_sent_at = None
+            elif "contentEnd" in event and event["contentEnd"].get("type") == "AUDIO":
+                answered.set()
+
+    try:
+        async with websockets.connect(url, max_size=None) as websocket:
+            receiver = asyncio.create_task(receive(websocket))
+            for event in session_setup_events(prompt_name, system_content, audio_content):
+                await websocket.send(json.dumps(event))
+                result.sent += 1
+
+            for _ in range(turns):
+                answered.clear()
+                # Real-time pace, corrected for drift so slow sends don't stretch the turn
+                started = time.monotonic()
+                for index, chunk in enumerate(chunks):
+                    await websocket.send(json.dumps({"event": {"audioInput": {
+                        "promptName": prompt_name, "contentName": audio_content, "content": chunk}}}))
+                    result.sent += 1
+                    await asyncio.sleep(max(0.0, started + (index + 1) * CHUNK_SECONDS - time.monotonic()))
+                turn_sent_at = time.monotonic()
+                try:
+                    await asyncio.wait_for(answered.wait(), turn_timeout)
+                except asyncio.TimeoutError:
+                    result.timeouts += 1
+                    turn_sent_at = None
+
+            for event in ({"event": {"contentEnd": {"promptName": prompt_name, "contentName": audio_content}}},
+                          {"event": {"promptEnd": {"promptName": prompt_name}}},
+                          {"event": {"sessionEnd": {}}}):
+                await websocket.send(json.dumps(event))
+                result.sent += 1
+            receiver.cancel()
+    except Exception as e:
+        result.error = str(e)
+
+
+class ProcessSampler:
+    """CPU time and resident memory of a process, read from /proc (Linux only)."""
+
+    def __init__(self, pid):
+        self.pid = pid
+        self.clock_ticks = os.sysconf("SC_CLK_TCK")
+        self.page_size = os.sysconf("SC_PAGE_SIZE")
+        self.peak_rss = 0
+
+    def cpu_seconds(self):
+        with open(f"/proc/{self.pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / self.clock_ticks
+
+    def rss_bytes(self):
+        with open(f"/proc/{self.pid}/statm") as f:
+            rss = int(f.read().split()[1]) * self.page_size
+        self.peak_rss = max(self.peak_rss, rss)
+        return rss
+
+    async def track_peak(self):
+        while True:
+            self.rss_bytes()
+            await asyncio.sleep(0.5)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port):
+    """Run server.py with the fake Bedrock backend and dummy credentials."""
+    env = {
+        **os.environ,
+        "S2S_BEDROCK_BACKEND": "fake",
+        "AWS_ACCESS_KEY_ID": os.environ.get("AWS_ACCESS_KEY_ID", "offline"),
+        "AWS_SECRET_ACCESS_KEY": os.environ.get("AWS_SECRET_ACCESS_KEY", "offline"),
+        "HOST": "127.0.0.1",
+        "WS_PORT": str(port),
+        "LOGLEVEL": os.environ.get("LOGLEVEL", "WARNING"),
+    }
+    env.pop("HEALTH_PORT", None)
+    return subprocess.Popen([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py")],
+                            env=env, stdout=subprocess.DEVNULL)
+
+
+async def wait_until_listening(url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            async with websockets.connect(url):
+                return
+        # Refused while the port is closed; a failed handshake (e.g. HTTP 503) while the server starts up
+        except (OSError, websockets.exceptions.InvalidHandshake):
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.2)
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+async def run(args):
+    chunks = load_recording(args.recording) if args.recording else \
+        [SYNTHETIC_CHUNK] * max(1, int(args.turn_seconds / CHUNK_SECONDS))
+
+    server, sampler = None, None
+    url = args.url
+    if not url:
+        port = free_port()
+        server = start_server(port)
+        url = f"ws://127.0.0.1:{port}"
+    try:
+        await wait_until_listening(url)
+        if server:
+            sampler = ProcessSampler(server.pid)
+            baseline_rss, baseline_cpu = sampler.rss_bytes(), sampler.cpu_seconds()
+            peak_task = asyncio.create_task(sampler.track_peak())
+
+        results = [SessionResult() for _ in range(args.sessions)]
+        started = time.monotonic()
+        tasks = []
+        for index, result in enumerate(results):
+            tasks.append(asyncio.create_task(run_session(url, chunks, args.turns, args.turn_timeout, result)))
+            # Spread session starts over the ramp so they don't all speak in lockstep
+            await asyncio.sleep(args.ramp_seconds / args.sessions)
+        await asyncio.gather(*tasks)
+        elapsed = time.monotonic() - started
+
+        latencies = [latency for result in results for latency in result.latencies]
+        report = {
+            "sessions": args.sessions,
+            "turns_per_session": args.turns,
+            "elapsed_seconds": round(elapsed, 2),
+            "failed_sessions": sum(1 for result in results if result.error),
+            "turn_timeouts": sum(result.timeouts for result in results),
+            "latency_ms": {
+                name: round(value * 1000, 1) if value is not None else None
+                for name, value in (("p50", percentile(latencies, 0.50)), ("p95", percentile(latencies, 0.95)),
+                                    ("p99", percentile(latencies, 0.99)))
+            },
+            "events_per_second": {
+                "sent": round(sum(result.sent for result in results) / elapsed, 1),
+                "received": round(sum(result.received for result in results) / elapsed, 1),
+            },
+        }
+        if sampler:
+            peak_task.cancel()
+            cpu = sampler.cpu_seconds() - baseline_cpu
+            report["server"] = {
+                "cpu_seconds": round(cpu, 2),
+                "cpu_percent_of_core": round(100 * cpu / elapsed, 1),
+                "cpu_ms_per_session_second": round(1000 * cpu / (elapsed * args.sessions), 2),
+                "baseline_rss_mb": round(baseline_rss / 2 ** 20, 1),
+                "peak_rss_mb": round(sampler.peak_rss / 2 ** 20, 1),
+                "rss_kb_per_session": round((sampler.peak_rss - baseline_rss) / 1024 / args.sessions, 1),
+            }
+        errors = [result.error for result in results if result.error]
+        if errors:
+            report["first_error"] = errors[0]
+        return report
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline load test for the S2S WebSocket server')
+    parser.add_argument('--sessions', type=int, default=10, help='Concurrent voice sessions')
+    parser.add_argument('--turns', type=int, default=3, help='User turns per session')
+    parser.add_argument('--turn-seconds', type=float, default=2.0, help='Length of a synthetic user turn')
+    parser.add_argument('--recording', help='JSON Lines client events whose audioInput is replayed as a turn')
+    parser.add_argument('--turn-timeout', type=float, default=30.0, help='Seconds to wait for an answer')
+    parser.add_argument('--ramp-seconds', type=float, default=2.0, help='Spread session starts over this time')
+    parser.add_argument('--url', help='Test an already running server instead of starting one (no CPU/memory report)')
+    parser.add_argument('--json', help='Also write the report to this file')
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+import asyncio
+import threading
+import time
+import weakref
+
+# Latency buckets in seconds, from fast audio paths up to slow agent tool calls
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+_lock = threading.Lock()
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in labels) + "}"
+
+
+class Counter:
+    """Monotonic counter, optionally split by labels."""
+
+    def __init__(self, name, help_text):
+        self.name, self.help_text = name, help_text
+        self.values = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self):
+        with _lock:
+            values = sorted(self.values.items())
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_format_labels(key)} {value}" for key, value in values]
+        return lines
+
+
+class Gauge:
+    """Point-in-time value, either set directly or read from a callback at scrape time."""
+
+    def __init__(self, name, help_text, callback=None):
+        self.name, self.help_text = name, help_text
+        self.callback = callback
+        self.values = {}
+
+    def set(self, value, **labels):
+        with _lock:
+            self.values[tuple(sorted(labels.items()))] = value
+
+    def render(self):
+        if self.callback:
+            values = sorted(self.callback().items())
+        else:
+            with _lock:
+                values = sorted(self.values.items())
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge"]
+        lines += [f"{self.name}{_format_labels(key)} {value}" for key, value in values]
+        return lines
+
+
+class Histogram:
+    """Cumulative histogram, optionally split by labels."""
+
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self.name, self.help_text = name, help_text
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            series = self.series.setdefault(key, {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0})
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def render(self):
+        with _lock:
+            snapshot = sorted((key, {**series, "counts": list(series["counts"])}) for key, series in self.series.items())
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for key, series in snapshot:
+            for bound, count in zip(self.buckets, series["counts"]):
+                lines.append(f"{self.name}_bucket{_format_labels(key + (('le', bound),))} {count}")
+            lines.append(f"{self.name}_bucket{_format_labels(key + (('le', '+Inf'),))} {series['count']}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {series['sum']}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {series['count']}")
+        return lines
+
+
+# Live session managers, so queue depths can be read at scrape time
+sessions = weakref.WeakSet()
+
+
+def _live_sessions():
+    # The health server thread reads the set while the event loop adds sessions to it
+    while True:
+        try:
+            return list(sessions)
+        except RuntimeError:
+            continue
+
+
+def _queue_depths():
+    depths = {(("queue", "audio_input"),): 0, (("queue", "output"),): 0}
+    for session in _live_sessions():
+        depths[(("queue", "audio_input"),)] += session.audio_input_queue.qsize()
+        depths[(("queue", "output"),)] += session.output_queue.qsize()
+    return depths
+
+
+ACTIVE_SESSIONS = Gauge("s2s_active_sessions", "Open S2S WebSocket sessions in this process")
+AUDIO_CHUNKS_RECEIVED = Counter("s2s_audio_chunks_received_total", "Audio chunks received from clients")
+AUDIO_EVENTS = Counter("s2s_audio_events_total",
+                       "Audio events sent to Bedrock (direction=in) and received from it (direction=out)")
+QUEUE_DEPTH = Gauge("s2s_queue_depth", "Items waiting in the session queues, summed over sessions",
+                    callback=_queue_depths)
+TOOL_LATENCY = Histogram("s2s_tool_latency_seconds", "Tool call latency by tool name and outcome")
+BEDROCK_FIRST_BYTE = Histogram("s2s_bedrock_first_byte_seconds",
+                               "Time from opening the Bedrock stream to its first response event")
+ASSISTANT_FIRST_AUDIO = Histogram("s2s_assistant_first_audio_seconds",
+                                  "Time from the final user transcript to the first assistant audio")
+EVENT_LOOP_LAG = Gauge("s2s_event_loop_lag_seconds", "How late the event loop woke up for a scheduled check")
+
+METRICS = (ACTIVE_SESSIONS, AUDIO_CHUNKS_RECEIVED, AUDIO_EVENTS, QUEUE_DEPTH, TOOL_LATENCY, BEDROCK_FIRST_BYTE,
+           ASSISTANT_FIRST_AUDIO, EVENT_LOOP_LAG)
+
+
+def render_metrics():
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in METRICS:
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+
+async def monitor_event_loop_lag(interval=0.5):
+    """Measure how far past its deadline the event loop wakes up a sleeping task."""
+    while True:
+        started = time.monotonic()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.set(round(max(0.0, time.monotonic() - started - interval), 6))
@@ -0,0 +1,88 @@
+import asyncio
+import os
+import re
+
+from boto3.dynamodb.conditions import Key
+
+# Optional: start fetching turbine data as soon as the user transcript mentions a turbine,
+# so the getTurbineSolarInfo tool call that follows finds it already loaded
+SPECULATIVE_PREFETCH = os.environ.get("S2S_SPECULATIVE_PREFETCH", "false").lower() == "true"
+# How long a tool call waits for an in-flight prefetch before going ahead without it
+PREFETCH_WAIT_SECONDS = float(os.environ.get("PREFETCH_WAIT_SECONDS", "2"))
+PREFETCH_OPTIMIZATION_ROWS = int(os.environ.get("PREFETCH_OPTIMIZATION_ROWS", "7"))
+CATALOG_TABLE = os.environ.get("catalog_table", "WT_Catalog")
+OPTIMIZATION_TABLE = os.environ.get("optimization_table", "WT_Asset_Optimization")
+
+# "WT-007", "wt 7", "turbine #7", as the ASR transcript may spell them
+TURBINE_ID_PATTERN = re.compile(r"\b(?:WT|turbine)[\s#_-]*(\d{1,3})\b", re.IGNORECASE)
+
+
+def extract_turbine_ids(text):
+    """Turbine IDs mentioned in the text, normalized to WT-001 form, in order of mention."""
+    turbine_ids = []
+    for match in TURBINE_ID_PATTERN.finditer(text or ""):
+        turbine_id = f"WT-{int(match.group(1)):03d}"
+        if turbine_id not in turbine_ids:
+            turbine_ids.append(turbine_id)
+    return turbine_ids
+
+
+def fetch_turbine_rows(dynamodb_resource, turbine_id):
+    """Catalog row and most recent asset optimization rows for a turbine (blocking)."""
+    catalog = dynamodb_resource.Table(CATALOG_TABLE).get_item(Key={'turbine_id': turbine_id}).get('Item')
+    optimization = dynamodb_resource.Table(OPTIMIZATION_TABLE).query(
+        KeyConditionExpression=Key('turbine_id').eq(turbine_id),
+        ScanIndexForward=False,
+        Limit=PREFETCH_OPTIMIZATION_ROWS,
+    ).get('Items', [])
+    return {"catalog": catalog, "asset_optimization": optimization}
+
+
+class TurbinePrefetcher:
+    """Per-session cache of turbine rows, filled speculatively from the user transcript."""
+
+    def __init__(self, dynamodb_resource, run_blocking, logger):
+        self.dynamodb_resource = dynamodb_resource
+        self.run_blocking = run_blocking
+        self.logger = logger
+        self.tasks = {}  # turbine_id -> prefetch task
+        self.stats = {"prefetched": 0, "hits": 0, "misses": 0}
+
+    def on_transcript(self, text):
+        """Start prefetching every turbine the transcript mentions that isn't cached yet."""
+        for turbine_id in extract_turbine_ids(text):
+            if turbine_id not in self.tasks:
+                self.tasks[turbine_id] = asyncio.create_task(self._prefetch(turbine_id))
+
+    async def _prefetch(self, turbine_id):
+        try:
+            rows = await self.run_blocking(fetch_turbine_rows, self.dynamodb_resource, turbine_id)
+            self.stats["prefetched"] += 1
+            return rows
+        except Exception as e:
+            self.logger.warning(f"Prefetch of {turbine_id} failed: {e}")
+            # Let a later mention retry
+            self.tasks.pop(turbine_id, None)
+            return None
+
+    async def reference_data(self, query):
+        """Prefetched rows for the turbines the query names; a query that names none gets none."""
+        reference = {}
+        for turbine_id in extract_turbine_ids(query):
+            task = self.tasks.get(turbine_id)
+            rows = None
+            if task:
+                try:
+                    rows = await asyncio.wait_for(asyncio.shield(task), PREFETCH_WAIT_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+            if rows:
+                self.stats["hits"] += 1
+                reference[turbine_id] = rows
+            else:
+                self.stats["misses"] += 1
+        return reference
+
+    def close(self):
+        for task in self.tasks.values():
+            task.cancel()
@@ -0,0 +1,140 @@
+import asyncio
+import base64
+import os
+import time
+
+AUDIO_INPUT_QUEUE_SIZE = int(os.environ.get("AUDIO_INPUT_QUEUE_SIZE", "200"))
+OUTPUT_QUEUE_SIZE = int(os.environ.get("OUTPUT_QUEUE_SIZE", "500"))
+# Audio chunk coalescing toward Bedrock: 3200 bytes is 100 ms of 16 kHz 16-bit mono PCM.
+# Setting either budget to 0 sends every chunk as its own event.
+AUDIO_COALESCE_MAX_BYTES = int(os.environ.get("AUDIO_COALESCE_MAX_BYTES", "3200"))
+AUDIO_COALESCE_MAX_MS = float(os.environ.get("AUDIO_COALESCE_MAX_MS", "100"))
+
+
+class DropOldestQueue(asyncio.Queue):
+    """Bounded queue that discards its oldest item instead of growing or blocking."""
+
+    def __init__(self, maxsize=AUDIO_INPUT_QUEUE_SIZE):
+        super().__init__(maxsize)
+        self.stats = {"dropped": 0, "max_depth": 0}
+
+    def put_nowait(self, item):
+        if self.full():
+            self.get_nowait()
+            self.stats["dropped"] += 1
+        super().put_nowait(item)
+        self.stats["max_depth"] = max(self.stats["max_depth"], self.qsize())
+
+    async def put(self, item):
+        self.put_nowait(item)
+
+    def metrics(self):
+        return {"depth": self.qsize(), **self.stats}
+
+
+class OutputEventQueue(asyncio.Queue):
+    """Bounded output queue; when full: drop-oldest for audio, coalescing for text deltas, blocking for control events."""
+
+    def __init__(self, maxsize=OUTPUT_QUEUE_SIZE):
+        super().__init__(maxsize)
+        self.stats = {"dropped": 0, "coalesced": 0, "blocked": 0, "max_depth": 0}
+
+    @staticmethod
+    def _event_name(item):
+        event = item.get("event") if isinstance(item, dict) else None
+        return next(iter(event)) if event else None
+
+    @staticmethod
+    def _is_marker(text_output):
+        # Nova Sonic signals barge-in with a textOutput whose content is JSON ({ "interrupted" : true }),
+        # which the client only recognizes as a delta of its own
+        return text_output.get("content", "").lstrip().startswith("{")
+
+    def _coalesce_text(self, item):
+        """Append a text delta to the last queued textOutput of the same content block."""
+        if not self._queue:
+            return False
+        last = self._queue[-1]
+        if self._event_name(last) != "textOutput":
+            return False
+        queued, delta = last["event"]["textOutput"], item["event"]["textOutput"]
+        if queued.get("contentId") != delta.get("contentId") or queued.get("role") != delta.get("role"):
+            return False
+        if self._is_marker(queued) or self._is_marker(delta):
+            return False
+        queued["content"] = queued.get("content", "") + delta.get("content", "")
+        return True
+
+    def _drop_oldest_audio(self):
+        for index, queued in enumerate(self._queue):
+            if self._event_name(queued) == "audioOutput":
+                del self._queue[index]
+                return True
+        return False
+
+    async def put(self, item):
+        event_name = self._event_name(item)
+        if self.full():
+            if event_name == "textOutput" and self._coalesce_text(item):
+                self.stats["coalesced"] += 1
+                return
+            if event_name == "audioOutput" and self._drop_oldest_audio():
+                self.stats["dropped"] += 1
+            else:
+                # Control events (and audio behind a queue full of control events) wait for space
+                self.stats["blocked"] += 1
+
+        await super().put(item)
+        self.stats["max_depth"] = max(self.stats["max_depth"], self.qsize())
+
+    def metrics(self):
+        return {"depth": self.qsize(), **self.stats}
+
+
+class AudioCoalescer:
+    """Merges consecutive audio chunks of the same content block up to a byte or time budget."""
+
+    def __init__(self, max_bytes=AUDIO_COALESCE_MAX_BYTES, max_ms=AUDIO_COALESCE_MAX_MS):
+        self.max_bytes = max_bytes
+        self.max_seconds = max_ms / 1000
+        self.enabled = max_bytes > 0 and max_ms > 0
+        self._key = None
+        self._chunks = []
+        self._size = 0
+        self._started = 0.0
+        self.stats = {"chunks_in": 0, "events_out": 0}
+
+    def add(self, prompt_name, content_name, audio):
+        """Buffer a chunk (base64 text or raw PCM) and return the batches that are ready to send."""
+        pcm = base64.b64decode(audio) if isinstance(audio, str) else bytes(audio)
+        self.stats["chunks_in"] += 1
+        ready = []
+        if self._chunks and self._key != (prompt_name, content_name):
+            ready.append(self.flush())
+        if not self._chunks:
+            self._key = (prompt_name, content_name)
+            self._started = time.monotonic()
+        self._chunks.append(pcm)
+        self._size += len(pcm)
+        if not self.enabled or self._size >= self.max_bytes or self.time_left() == 0:
+            ready.append(self.flush())
+        return ready
+
+    def time_left(self):
+        """Seconds until the buffered audio must be sent, or None when nothing is buffered."""
+        if not self._chunks:
+            return None
+        return max(0.0, self.max_seconds - (time.monotonic() - self._started))
+
+    def flush(self):
+        """Return the buffered audio as (prompt_name, content_name, base64 content), or None."""
+        if not self._chunks:
+            return None
+        prompt_name, content_name = self._key
+        content = base64.b64encode(b"".join(self._chunks)).decode("ascii")
+        self._key, self._chunks, self._size = None, [], 0
+        self.stats["events_out"] += 1
+        return prompt_name, content_name, content
+
+    def metrics(self):
+        return dict(self.stats)
@@ -3,23 +3,46 @@ import json
 import warnings
 import uuid
 from s2s_events import S2sEvent
+from s2s_queues import DropOldestQueue, OutputEventQueue, AudioCoalescer
+from s2s_codec import dumps_bytes, loads, DecodeError
+import s2s_metrics as metrics
 # import bedrock_knowledge_bases as kb
 import time
 
 from aws_sdk_bedrock_runtime.client import BedrockRuntimeClient, InvokeModelWithBidirectionalStreamOperationInput
 from aws_sdk_bedrock_runtime.models import InvokeModelWithBidirectionalStreamInputChunk, BidirectionalInputPayloadPart
 from aws_sdk_bedrock_runtime.config import Config, HTTPAuthSchemeResolver, SigV4AuthScheme
-from smithy_aws_core.credentials_resolvers.environment import EnvironmentCredentialsResolver
 
-from energy_agents.turbine_solar_sonic_agent import handle_request as turbine_solar_sonic_agent
+from energy_agents.turbine_solar_sonic_agent import handle_request as turbine_solar_sonic_agent, end_session as end_sonic_agent_session
+from client_factory import get_client, get_resource
+from s2s_prefetch import SPECULATIVE_PREFETCH, TurbinePrefetcher
+from credentials_provider import get_credentials_provider, ProviderCredentialsResolver
 
-import boto3
 import json
 import os
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # Suppress warnings
 warnings.filterwarnings("ignore")
 
+# Blocking tool calls (boto3 Lambda invokes, the agent squad orchestrator) run on this
+# bounded pool so they never stall audio and event forwarding on the event loop. A timed-out or
+# abandoned orchestrator run is signalled to stop, but keeps its worker until its in-flight call returns
+TOOL_EXECUTOR = ThreadPoolExecutor(max_workers=int(os.environ.get("TOOL_EXECUTOR_WORKERS", "16")),
+                                   thread_name_prefix="s2s-tool")
+# "fake" swaps Bedrock for the scripted offline stream in fake_bedrock_stream.py (load testing only)
+BEDROCK_BACKEND = os.environ.get("S2S_BEDROCK_BACKEND", "bedrock")
+# Slow tools tell the client app right away that they are working, then stream partial answers to it.
+# Nova Sonic takes a single toolResult per tool content block, so the model still gets the complete result.
+INTERIM_STATUS_TOOLS = {"getTurbineSolarInfo"}
+STREAM_TOOL_PROGRESS = os.environ.get("S2S_STREAM_TOOL_PROGRESS", "true").lower() == "true"
+DEFAULT_TOOL_TIMEOUT_SECONDS = float(os.environ.get("TOOL_TIMEOUT_SECONDS", "30"))
+TOOL_TIMEOUT_SECONDS = {
+    "getTurbineSolarInfo": float(os.environ.get("TURBINE_SOLAR_TOOL_TIMEOUT_SECONDS", "90")),
+}
+
 class S2sSessionManager:
     """Manages bidirectional streaming with AWS Bedrock using asyncio"""
     
@@ -32,58 +55,66 @@ class S2sSessionManager:
         if logger:
             self.logger = logger
         
-        # Audio and output queues
-        self.audio_input_queue = asyncio.Queue()
-        self.output_queue = asyncio.Queue()
+        # Bounded audio and output queues, so slow clients or streams can't grow memory without limit
+        self.audio_input_queue = DropOldestQueue()
+        self.output_queue = OutputEventQueue()
+        # Merges small browser audio chunks into fewer Bedrock input events
+        self.audio_coalescer = AudioCoalescer()
+        self.audio_send_lock = asyncio.Lock()
+        metrics.sessions.add(self)
+
+        # Latency markers for the first-byte and time-to-first-audio metrics
+        self.stream_opened_at = None
+        self.user_transcript_at = None
         
         self.response_task = None
         self.stream = None
         self.is_active = False
+        self.closed = False
         self.bedrock_client = None
         
         # Session information
         self.prompt_name = None  # Will be set from frontend
         self.content_name = None  # Will be set from frontend
         self.audio_content_name = None  # Will be set from frontend
-        self.toolUseContent = ""
-        self.toolUseId = ""
-        self.toolName = ""
+        # Tool uses waiting for their contentEnd, and in-flight tool tasks, by toolUseId
+        self.pending_tool_uses = {}
+        self.tool_tasks = {}
+        # Cancel signals of orchestrator runs on worker threads, set on timeout and on close
+        self.tool_cancel_events = set()
+        self.tool_result_lock = asyncio.Lock()
 
         # Boto3 clients
-        self.sts_client = None
         self.lambda_client = None
+        # Speculative turbine data prefetch, created with the clients when S2S_SPECULATIVE_PREFETCH is on
+        self.prefetcher = None
+        self.credentials_provider = get_credentials_provider(aws_key, aws_secret, region, logger)
 
         self.USER_ID = str(uuid.uuid4())
         self.SESSION_ID = str(uuid.uuid4())
 
-    def _initialize_client(self):
-        # Get session token from sts using key and secret and set to env varaibles
-        if "AWS_SESSION_TOKEN" not in os.environ:
-            self.sts_client = boto3.client(
-                'sts',
-                aws_access_key_id=self.aws_key,
-                aws_secret_access_key=self.aws_secret,
-                region_name=self.region,
-            )
-            response = self.sts_client.get_session_token(DurationSeconds=7200)
-            credentials = response['Credentials']
-            os.environ["AWS_ACCESS_KEY_ID"] = credentials['AccessKeyId']
-            os.environ["AWS_SECRET_ACCESS_KEY"] = credentials['SecretAccessKey']
-            os.environ["AWS_SESSION_TOKEN"] = credentials['SessionToken']
-
-        # Init Lambda client
-        self.lambda_client = boto3.client('lambda',
-            aws_access_key_id=os.environ["AWS_ACCESS_KEY_ID"],
-            aws_secret_access_key=os.environ["AWS_SECRET_ACCESS_KEY"],
-            aws_session_token=os.environ["AWS_SESSION_TOKEN"],
+    def _initialize_client(self, credentials):
+        # Init Lambda client with the shared session credentials
+        self.lambda_client = get_client('lambda',
+            aws_access_key_id=credentials["AccessKeyId"],
+            aws_secret_access_key=credentials["SecretAccessKey"],
+            aws_session_token=credentials["SessionToken"],
             region_name=self.region,
         )
+        if SPECULATIVE_PREFETCH:
+            dynamodb_resource = get_resource('dynamodb',
+                aws_access_key_id=credentials["AccessKeyId"],
+                aws_secret_access_key=credentials["SecretAccessKey"],
+                aws_session_token=credentials["SessionToken"],
+                region_name=self.region,
+            )
+            self.prefetcher = TurbinePrefetcher(dynamodb_resource, self._run_blocking, self.logger)
 
         """Initialize the Bedrock client."""
         config = Config(
             endpoint_uri=f"https://bedrock-runtime.{self.region}.amazonaws.com",
             region=self.region,
-            aws_credentials_identity_resolver=EnvironmentCredentialsResolver(),
+            aws_credentials_identity_resolver=ProviderCredentialsResolver(self.credentials_provider),
             http_auth_scheme_resolver=HTTPAuthSchemeResolver(),
             http_auth_schemes={"aws.auth#sigv4": SigV4AuthScheme()}
         )
@@ -92,15 +123,21 @@ class S2sSessionManager:
     async def initialize_stream(self):
         """Initialize the bidirectional stream with Bedrock."""
         try:
-            #if not self.bedrock_client:
-            self._initialize_client()
-        except Exception as ex:
+            if BEDROCK_BACKEND == "fake":
+                from fake_bedrock_stream import FakeBedrockRuntimeClient
+                self.bedrock_client = FakeBedrockRuntimeClient()
+            else:
+                # Session credentials are cached process-wide and refreshed in the background
+                credentials = await self.credentials_provider.get_credentials_async()
+                self._initialize_client(credentials)
+        except Exception as e:
             self.is_active = False
             self.logger.error(f"Failed to initialize Bedrock client: {str(e)}")
             raise
 
         try:
             # Initialize the stream
+            self.stream_opened_at = time.monotonic()
             self.stream = await self.bedrock_client.invoke_model_with_bidirectional_stream(
                 InvokeModelWithBidirectionalStreamOperationInput(model_id=self.model_id)
             )
@@ -129,49 +166,81 @@ class S2sSessionManager:
                 #self.logger.error("Stream not initialized or closed")
                 return
             
-            event_json = json.dumps(event_data)
+            # Hot-path events arrive pre-serialized from the S2sEvent templates
+            event_bytes = event_data if isinstance(event_data, bytes) else dumps_bytes(event_data)
             event = InvokeModelWithBidirectionalStreamInputChunk(
-                value=BidirectionalInputPayloadPart(bytes_=event_json.encode('utf-8'))
+                value=BidirectionalInputPayloadPart(bytes_=event_bytes)
             )
             await self.stream.input_stream.send(event)
 
             # Close session
-            if "sessionEnd" in event_data["event"]:
-                self.close()
+            if isinstance(event_data, dict) and "sessionEnd" in event_data["event"]:
+                await self.close()
             
         except Exception as e:
             self.logger.error(f"Error sending event: {str(e)}")
     
     async def _process_audio_input(self):
-        """Process audio input from the queue and send to Bedrock."""
+        """Process audio input from the queue, coalesce it and send it to Bedrock."""
         while self.is_active:
             try:
-                # Get audio data from the queue
-                data = await self.audio_input_queue.get()
-                
-                # Extract data from the queue item
-                prompt_name = data.get('prompt_name')
-                content_name = data.get('content_name')
-                audio_bytes = data.get('audio_bytes')
-                
-                if not audio_bytes or not prompt_name or not content_name:
-                    self.logger.error("Missing required audio data properties")
+                # Wake up when the buffered audio reaches its time budget, even if no new chunk arrives
+                time_left = self.audio_coalescer.time_left()
+                try:
+                    data = await asyncio.wait_for(self.audio_input_queue.get(), time_left) if time_left is not None \
+                        else await self.audio_input_queue.get()
+                except asyncio.TimeoutError:
+                    async with self.audio_send_lock:
+                        await self._send_audio_batch(self.audio_coalescer.flush())
                     continue
 
-                # Create the audio input event
-                audio_event = S2sEvent.audio_input(prompt_name, content_name, audio_bytes.decode('utf-8') if isinstance(audio_bytes, bytes) else audio_bytes)
-                
-                # Send the event
-                await self.send_raw_event(audio_event)
+                async with self.audio_send_lock:
+                    await self._coalesce_audio(data)
                 
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 self.logger.error(f"Error processing audio: {e}")
+
+    async def _coalesce_audio(self, data):
+        """Add a queued chunk to the coalescer and send any batches it releases."""
+        # Extract data from the queue item
+        prompt_name = data.get('prompt_name')
+        content_name = data.get('content_name')
+        audio_bytes = data.get('audio_bytes')
+
+        if not audio_bytes or not prompt_name or not content_name:
+            self.logger.error("Missing required audio data properties")
+            return
+
+        for batch in self.audio_coalescer.add(prompt_name, content_name, audio_bytes):
+            await self._send_audio_batch(batch)
+
+    async def _send_audio_batch(self, batch):
+        if batch:
+            prompt_name, content_name, content = batch
+            metrics.AUDIO_EVENTS.inc(direction="in")
+            await self.send_raw_event(S2sEvent.audio_input_bytes(prompt_name, content_name, content))
+
+    async def flush_audio_input(self):
+        """Send all queued and buffered audio, so a following contentEnd can't overtake it."""
+        async with self.audio_send_lock:
+            while not self.audio_input_queue.empty():
+                await self._coalesce_audio(self.audio_input_queue.get_nowait())
+            await self._send_audio_batch(self.audio_coalescer.flush())
     
+    def queue_metrics(self):
+        """Return per-session queue depth, drop and coalescing counters."""
+        return {
+            "audio_input": self.audio_input_queue.metrics(),
+            "output": self.output_queue.metrics(),
+            "audio_coalescer": self.audio_coalescer.metrics(),
+        }
+
     def add_audio_chunk(self, prompt_name, content_name, audio_data):
         """Add an audio chunk to the queue."""
-        # The audio_data is already a base64 string from the frontend
+        # audio_data is a base64 string (JSON clients) or raw PCM (binary clients); the oldest chunk is dropped when full
+        metrics.AUDIO_CHUNKS_RECEIVED.inc()
         self.audio_input_queue.put_nowait({
             'prompt_name': prompt_name,
             'content_name': content_name,
@@ -186,57 +255,47 @@ class S2sSessionManager:
                 result = await output[1].receive()
                 
                 if result.value and result.value.bytes_:
-                    response_data = result.value.bytes_.decode('utf-8')
+                    response_data = result.value.bytes_
                     
-                    json_data = json.loads(response_data)
+                    json_data = loads(response_data)
                     json_data["timestamp"] = int(time.time() * 1000)  # Milliseconds since epoch
                     
+                    if self.stream_opened_at is not None:
+                        metrics.BEDROCK_FIRST_BYTE.observe(time.monotonic() - self.stream_opened_at)
+                        self.stream_opened_at = None
+
                     event_name = None
                     if 'event' in json_data:
                         event_name = list(json_data["event"].keys())[0]
+                        if event_name == 'audioOutput':
+                            metrics.AUDIO_EVENTS.inc(direction="out")
+                            if self.user_transcript_at is not None:
+                                metrics.ASSISTANT_FIRST_AUDIO.observe(time.monotonic() - self.user_transcript_at)
+                                self.user_transcript_at = None
+                        elif event_name == 'textOutput' and json_data['event'][event_name].get('role') == 'USER':
+                            self.user_transcript_at = time.monotonic()
+                            # Warm turbine data while the model is still deciding to call the tool
+                            if self.prefetcher:
+                                self.prefetcher.on_transcript(json_data['event'][event_name].get('content'))
                         # Handle tool use detection
                         if event_name == 'toolUse':
-                            self.toolUseContent = json_data['event']['toolUse']
-                            self.toolName = json_data['event']['toolUse']['toolName']
-                            self.toolUseId = json_data['event']['toolUse']['toolUseId']
-                            self.logger.info(f"Tool use detected: {self.toolName}, ID: {self.toolUseId}, "+ json.dumps(json_data['event']))
+                            tool_use = json_data['event']['toolUse']
+                            self.pending_tool_uses[tool_use['toolUseId']] = tool_use
+                            self.logger.info(f"Tool use detected: {tool_use['toolName']}, ID: {tool_use['toolUseId']}, "+ json.dumps(json_data['event']))
 
-                        # Process tool use when content ends
+                        # Start the tool when its content ends; the result is sent when the task completes
                         elif event_name == 'contentEnd' and json_data['event'][event_name].get('type') == 'TOOL':
-                            prompt_name = json_data['event']['contentEnd'].get("promptName")
-                            self.logger.debug("Processing tool use and sending result")
-                            tool_result, client_data = await self.processToolUse(self.toolName, self.toolUseContent)
-                            if tool_result or client_data:
-                                # Send tool start event
-                                toolContent = str(uuid.uuid4())
-                                tool_start_event = S2sEvent.content_start_tool(prompt_name, toolContent, self.toolUseId)
-                                await self.send_raw_event(tool_start_event)
-                                
-                                # Send tool result event
-                                if isinstance(tool_result, dict):
-                                    content_json_string = json.dumps(tool_result)
-                                else:
-                                    content_json_string = tool_result
-                                tool_result_event = S2sEvent.text_input_tool(prompt_name, toolContent, content_json_string)
-                                await self.send_raw_event(tool_result_event)
-
-                                # Send tool content end event
-                                tool_content_end_event = S2sEvent.content_end(prompt_name, toolContent)
-                                self.logger.debug(tool_content_end_event)
-                                await self.send_raw_event(tool_content_end_event)
-
-                                # Send customized client events to client app
-                                if client_data:
-                                    client_event = S2sEvent.client_custom(str(uuid.uuid4()), client_data)
-                                    await self.output_queue.put(client_event)
-                                    client_data = None
+                            content_end = json_data['event']['contentEnd']
+                            tool_use = self._pop_pending_tool_use(content_end.get("contentId"))
+                            if tool_use:
+                                self._start_tool(content_end.get("promptName"), tool_use)
                     
                     # Put the response in the output queue for forwarding to the frontend
                     await self.output_queue.put(json_data)
 
-            except json.JSONDecodeError as ex:
+            except DecodeError as ex:
                 self.logger.error(ex)
-                await self.output_queue.put({"raw_data": response_data})
+                await self.output_queue.put({"raw_data": response_data.decode('utf-8', errors='replace')})
             except StopAsyncIteration as ex:
                 # Stream has ended
                 self.logger.error(ex)
@@ -250,7 +309,112 @@ class S2sSessionManager:
                 break
 
         self.is_active = False
-        self.close()
+        await self.close()
+
+    def _pop_pending_tool_use(self, content_id):
+        """Return the pending tool use for a content block, falling back to the oldest one."""
+        for tool_use_id, tool_use in self.pending_tool_uses.items():
+            if content_id and tool_use.get("contentId") == content_id:
+                return self.pending_tool_uses.pop(tool_use_id)
+        if self.pending_tool_uses:
+            return self.pending_tool_uses.pop(next(iter(self.pending_tool_uses)))
+        return None
+
+    def _start_tool(self, prompt_name, tool_use):
+        """Run a tool in the background so the receive loop keeps draining the model stream."""
+        tool_use_id = tool_use['toolUseId']
+        task = asyncio.create_task(self._run_tool_and_respond(prompt_name, tool_use))
+        self.tool_tasks[tool_use_id] = task
+        task.add_done_callback(lambda _: self.tool_tasks.pop(tool_use_id, None))
+
+    async def _run_tool_and_respond(self, prompt_name, tool_use):
+        """Execute a tool and send its result back to Bedrock as soon as it completes."""
+        self.logger.debug("Processing tool use and sending result")
+        interim = STREAM_TOOL_PROGRESS and tool_use['toolName'] in INTERIM_STATUS_TOOLS
+        if interim:
+            await self.output_queue.put(S2sEvent.client_custom(
+                tool_use['toolUseId'], {"status": "working", "tool": tool_use['toolName']}))
+        tool_result, client_data = await self.execute_tool(tool_use['toolName'], tool_use)
+        if interim:
+            await self.output_queue.put(S2sEvent.client_custom(
+                tool_use['toolUseId'], {"status": "done", "tool": tool_use['toolName']}))
+        if not (tool_result or client_data):
+            return
+
+        # Keep each tool's start/result/end events together when several tools finish at once
+        async with self.tool_result_lock:
+            # Send tool start event
+            toolContent = str(uuid.uuid4())
+            tool_start_event = S2sEvent.content_start_tool(prompt_name, toolContent, tool_use['toolUseId'])
+            await self.send_raw_event(tool_start_event)
+
+            # Send tool result event
+            if isinstance(tool_result, dict):
+                content_json_string = json.dumps(tool_result)
+            else:
+                content_json_string = tool_result
+            tool_result_event = S2sEvent.text_input_tool(prompt_name, toolContent, content_json_string)
+            await self.send_raw_event(tool_result_event)
+
+            # Send tool content end event
+            tool_content_end_event = S2sEvent.content_end_bytes(prompt_name, toolContent)
+            self.logger.debug(tool_content_end_event)
+            await self.send_raw_event(tool_content_end_event)
+
+        # Send customized client events to client app
+        if client_data:
+            client_event = S2sEvent.client_custom(str(uuid.uuid4()), client_data)
+            await self.output_queue.put(client_event)
+
+    def _tool_progress_callback(self, tool_use_id):
+        """Callback for the tool's worker thread that forwards partial text to the client app."""
+        if not STREAM_TOOL_PROGRESS:
+            return None
+        loop = asyncio.get_running_loop()
+
+        def on_chunk(text):
+            # The session (and its loop) may have closed while the orchestrator was still answering
+            if self.closed or loop.is_closed():
+                return
+            try:
+                loop.call_soon_threadsafe(self._put_progress, S2sEvent.client_custom(tool_use_id, {"partial": text}))
+            except RuntimeError:
+                pass
+        return on_chunk
+
+    def _put_progress(self, event):
+        """Queue a partial tool answer, dropping it when the output queue is full; progress is best effort."""
+        if self.closed:
+            return
+        try:
+            self.output_queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.output_queue.stats["dropped"] += 1
+
+    async def _run_blocking(self, func, *args):
+        """Run a blocking call on the bounded tool executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(TOOL_EXECUTOR, functools.partial(func, *args))
+
+    async def execute_tool(self, toolName, toolUseContent):
+        """Run a tool with its timeout."""
+        started = time.monotonic()
+        outcome = "error"
+        try:
+            tool_result, client_data = await asyncio.wait_for(self.processToolUse(toolName, toolUseContent),
+                                          timeout=TOOL_TIMEOUT_SECONDS.get(toolName, DEFAULT_TOOL_TIMEOUT_SECONDS))
+            if tool_result or client_data:
+                outcome = "ok"
+            return tool_result, client_data
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            self.logger.error(f"Tool {toolName} timed out")
+            return {"result": f"The {toolName} tool did not respond in time."}, None
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            metrics.TOOL_LATENCY.observe(time.monotonic() - started, tool=toolName, outcome=outcome)
 
     async def processToolUse(self, toolName, toolUseContent):
         try:
@@ -265,7 +429,7 @@ class S2sSessionManager:
                 return None, None
             
             if toolName.startswith("lambda_"):
-                response = self.call_lambda(toolName.replace("lambda_",""), query)
+                response = await self._run_blocking(self.call_lambda, toolName.replace("lambda_",""), query)
                 result = { "result_from_files": response.get("body").get("text")}
 
                 # Default None
@@ -282,24 +446,60 @@ class S2sSessionManager:
                 result = {"result": f"In UTC: {datetime.now(timezone.utc).strftime('%A, %Y-%m-%d %H-%M-%S')}"}
 
             if toolName == "getTurbineSolarInfo":
-                final_response = await turbine_solar_sonic_agent(query, self.USER_ID, self.SESSION_ID)
+                # Hand the Bedrock agents turbine rows already prefetched from the transcript as prompt
+                # session attributes, so routing and the caches still see the query as the user asked it
+                additional_params = {}
+                if self.prefetcher:
+                    reference = await self.prefetcher.reference_data(query)
+                    if reference:
+                        additional_params = {"sessionState": {"promptSessionAttributes": {
+                            "turbine_reference_data": json.dumps(reference, default=str)}}}
+                # The orchestrator makes synchronous boto3 calls, so give it its own loop on a worker thread
+                on_chunk = self._tool_progress_callback(toolUseContent.get("toolUseId"))
+                cancel = threading.Event()
+                self.tool_cancel_events.add(cancel)
+                try:
+                    final_response = await self._run_blocking(
+                        lambda: asyncio.run(turbine_solar_sonic_agent(query, self.USER_ID, self.SESSION_ID, on_chunk,
+                                                                      additional_params, cancel)))
+                except asyncio.CancelledError:
+                    # Timed out or the session closed: only this await is cancelled, so tell the
+                    # orchestrator run on the worker thread to stop as well
+                    cancel.set()
+                    raise
+                finally:
+                    self.tool_cancel_events.discard(cancel)
                 result = {"result": final_response}
                 
             return result, client_data
         except Exception as ex:
             self.logger.error(f"Failed to process ToolUse event. ToolName: {toolName}, ToolUseContext: {toolUseContent} Exception: {ex}")
+            return None, None
     
     async def close(self):
-        """Close the stream properly."""
-        if not self.is_active:
+        """Close the stream properly; safe to call more than once and from the response task."""
+        if self.closed:
             return
-            
+
+        self.closed = True
         self.is_active = False
+        self.logger.info(f"Session {self.SESSION_ID} queue metrics: {self.queue_metrics()}")
+
+        # Cancel tools still running for this session, including orchestrator runs on worker threads
+        for cancel in list(self.tool_cancel_events):
+            cancel.set()
+        for task in list(self.tool_tasks.values()):
+            task.cancel()
+        if self.prefetcher:
+            self.logger.info(f"Session {self.SESSION_ID} prefetch stats: {self.prefetcher.stats}")
+            self.prefetcher.close()
+        # Free this session's agent conversation history now rather than at idle eviction
+        end_sonic_agent_session(self.USER_ID, self.SESSION_ID)
         
         if self.stream:
             await self.stream.input_stream.close()
         
-        if self.response_task and not self.response_task.done():
+        if self.response_task and not self.response_task.done() and self.response_task is not asyncio.current_task():
             self.response_task.cancel()
             try:
                 await self.response_task
@@ -1,13 +1,19 @@
 import asyncio
+import base64
 import websockets
 import json
 import logging
 import warnings
 from s2s_session_manager import S2sSessionManager
+from s2s_codec import dumps, loads, DecodeError
+from s2s_metrics import ACTIVE_SESSIONS, render_metrics, monitor_event_loop_lag
+from s2s_binary import BINARY_AUDIO_SUBPROTOCOL, AUDIO_INPUT_FRAME, AUDIO_OUTPUT_FRAME, encode_audio_frame, decode_audio_frame
 import argparse
 import http.server
 import threading
 import os
+import signal
+import time
 from http import HTTPStatus
 
 # Configure logging
@@ -28,8 +34,23 @@ HEALTH_PORT = os.environ.get("HEALTH_PORT")
 if HEALTH_PORT:
     HEALTH_PORT = int(HEALTH_PORT)
 HOST = os.environ["HOST"]
+# How long a draining server waits for open sessions to finish before closing them
+DRAIN_TIMEOUT_SECONDS = float(os.environ.get("DRAIN_TIMEOUT_SECONDS", "30"))
+
+# Open WebSocket sessions in this process, and whether it is draining for shutdown
+active_sessions = set()
+draining = False
+
+
+def local_health_status():
+    """Health of this server process."""
+    return {"status": "draining" if draining else "healthy", "pid": os.getpid(), "sessions": len(active_sessions)}
+
 
 class HealthCheckHandler(http.server.BaseHTTPRequestHandler):
+    # Replaced by the launcher with a status that aggregates all worker processes
+    status_provider = staticmethod(local_health_status)
+
     def do_GET(self):
         client_ip = self.client_address[0]
         logger.info(
@@ -37,13 +58,23 @@ class HealthCheckHandler(http.server.BaseHTTPRequestHandler):
         )
 
         if self.path == "/health" or self.path == "/":
-            logger.info(f"Responding with 200 OK to health check from {client_ip}")
-            self.send_response(HTTPStatus.OK)
+            health = self.status_provider()
+            # Draining or unhealthy servers answer 503 so the load balancer stops routing new sessions to them
+            status_code = HTTPStatus.OK if health["status"] == "healthy" else HTTPStatus.SERVICE_UNAVAILABLE
+            logger.info(f"Responding with {status_code.value} to health check from {client_ip}")
+            self.send_response(status_code)
             self.send_header("Content-Type", "application/json")
             self.end_headers()
-            response = json.dumps({"status": "healthy"})
+            response = json.dumps(health)
             self.wfile.write(response.encode("utf-8"))
             logger.info(f"Health check response sent: {response}")
+        elif self.path == "/metrics":
+            body = render_metrics().encode("utf-8")
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
         else:
             logger.info(
                 f"Responding with 404 Not Found to request for {self.path} from {client_ip}"
@@ -56,8 +87,10 @@ class HealthCheckHandler(http.server.BaseHTTPRequestHandler):
         pass
 
 
-def start_health_check_server(health_host, health_port):
+def start_health_check_server(health_host, health_port, status_provider=None):
     """Start the HTTP health check server on port 80."""
+    if status_provider:
+        HealthCheckHandler.status_provider = staticmethod(status_provider)
     try:
         # Create the server with a socket timeout to prevent hanging
         httpd = http.server.HTTPServer((health_host, health_port), HealthCheckHandler)
@@ -95,14 +128,31 @@ def start_health_check_server(health_host, health_port):
         logger.error(f"Failed to start health check server: {e}", exc_info=True)
 
 
+def select_subprotocol(connection, subprotocols):
+    """Use binary audio when the client offers it; clients that offer no sub-protocol keep JSON audio"""
+    return BINARY_AUDIO_SUBPROTOCOL if BINARY_AUDIO_SUBPROTOCOL in subprotocols else None
+
+
 async def websocket_handler(websocket):
     stream_manager = None
+    forward_task = None
+    # Clients that negotiate the binary sub-protocol send and receive audio as raw PCM frames
+    binary_audio = websocket.subprotocol == BINARY_AUDIO_SUBPROTOCOL
+    active_sessions.add(websocket)
+    ACTIVE_SESSIONS.set(len(active_sessions))
     try:
         async for message in websocket:
             try:
-                data = json.loads(message)
+                if isinstance(message, bytes):
+                    frame_type, content_name, pcm = decode_audio_frame(message)
+                    if stream_manager and frame_type == AUDIO_INPUT_FRAME:
+                        # Raw PCM is base64-encoded once per coalesced batch, not per chunk
+                        stream_manager.add_audio_chunk(stream_manager.prompt_name, content_name, bytes(pcm))
+                    continue
+
+                data = loads(message)
                 if 'body' in data:
-                    data = json.loads(data["body"])
+                    data = loads(data["body"])
                 if 'event' in data:
                     if stream_manager == None:
                         """Handle WebSocket connections from the frontend."""
@@ -117,9 +167,9 @@ async def websocket_handler(websocket):
                         await stream_manager.initialize_stream()
                         
                         # Start a task to forward responses from Bedrock to the WebSocket
-                        forward_task = asyncio.create_task(forward_responses(websocket, stream_manager))
+                        forward_task = asyncio.create_task(forward_responses(websocket, stream_manager, binary_audio))
 
-                        event_type = list(data['event'].keys())[0]
+                    event_type = list(data['event'].keys())[0]
 
                     # Store prompt name and content names if provided
                     if event_type and event_type == 'promptStart':
@@ -137,9 +187,12 @@ async def websocket_handler(websocket):
                         # Add to the audio queue
                         stream_manager.add_audio_chunk(prompt_name, content_name, audio_base64)
                     else:
+                        # Audio still buffered for coalescing must reach Bedrock before its contentEnd
+                        if event_type == 'contentEnd':
+                            await stream_manager.flush_audio_input()
                         # Send other events directly to Bedrock
                         await stream_manager.send_raw_event(data)
-            except json.JSONDecodeError:
+            except DecodeError:
                 print("Invalid JSON received from WebSocket")
             except Exception as e:
                 print(f"Error processing WebSocket message: {e}")
@@ -149,13 +202,17 @@ async def websocket_handler(websocket):
     finally:
         # Clean up
         print("cleaning up")
-        await stream_manager.close()
-        forward_task.cancel()
+        active_sessions.discard(websocket)
+        ACTIVE_SESSIONS.set(len(active_sessions))
+        if stream_manager:
+            await stream_manager.close()
+        if forward_task:
+            forward_task.cancel()
         if websocket:
-            websocket.close()
+            await websocket.close()
 
 
-async def forward_responses(websocket, stream_manager):
+async def forward_responses(websocket, stream_manager, binary_audio=False):
     """Forward responses from Bedrock to the WebSocket."""
     try:
         while True:
@@ -164,7 +221,19 @@ async def forward_responses(websocket, stream_manager):
             
             # Send to WebSocket
             try:
-                event = json.dumps(response)
+                audio_output = response.get('event', {}).get('audioOutput') if binary_audio else None
+                if audio_output:
+                    try:
+                        frame = encode_audio_frame(AUDIO_OUTPUT_FRAME, audio_output['contentId'],
+                                                   base64.b64decode(audio_output['content']))
+                    except ValueError as e:
+                        # A content id too long for the frame header goes out as a JSON event instead
+                        logger.warning(f"Sending audio as JSON: {e}")
+                        frame = None
+                    if frame is not None:
+                        await websocket.send(frame)
+                        continue
+                event = dumps(response)
                 await websocket.send(event)
             except websockets.exceptions.ConnectionClosed:
                 break
@@ -174,10 +243,31 @@ async def forward_responses(websocket, stream_manager):
     except Exception as e:
         print(f"Error forwarding responses: {e}")
         # Close connection
-        websocket.close()
-        stream_manager.close()
+        await websocket.close()
+        await stream_manager.close()
+
+async def report_status(report):
+    """Publish this worker's session count and drain state to the launcher once a second."""
+    while True:
+        report(len(active_sessions), draining)
+        await asyncio.sleep(1)
+
+
+async def drain(server):
+    """Stop accepting connections and give open sessions time to finish."""
+    global draining
+    draining = True
+    server.close(close_connections=False)
+    logger.info(f"Draining {len(active_sessions)} sessions (pid {os.getpid()})")
 
-async def main(host, port, health_port):
+    deadline = time.monotonic() + DRAIN_TIMEOUT_SECONDS
+    while active_sessions and time.monotonic() < deadline:
+        await asyncio.sleep(0.5)
+    if active_sessions:
+        logger.warning(f"Closing {len(active_sessions)} sessions still open after {DRAIN_TIMEOUT_SECONDS}s")
+
+
+async def main(host, port, health_port, reuse_port=False, report=None):
 
     if health_port:
         try:
@@ -185,14 +275,28 @@ async def main(host, port, health_port):
         except Exception as ex:
             print("Failed to start health check endpoint",ex)
 
+    # SIGTERM (and Ctrl-C) drain the server instead of dropping live voice sessions
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
     """Main function to run the WebSocket server."""
     try:
-        # Start WebSocket server
-        async with websockets.serve(websocket_handler, host, port):
-            print(f"WebSocket server started at host:{host}, port:{port}")
-            
-            # Keep the server running forever
-            await asyncio.Future()
+        # Start WebSocket server; worker processes started by launcher.py share the port through SO_REUSEPORT
+        async with websockets.serve(websocket_handler, host, port, select_subprotocol=select_subprotocol,
+                                    reuse_port=reuse_port) as server:
+            print(f"WebSocket server started at host:{host}, port:{port}, pid:{os.getpid()}")
+            status_task = asyncio.create_task(report_status(report)) if report else None
+            lag_task = asyncio.create_task(monitor_event_loop_lag())
+
+            # Serve until asked to stop, then drain
+            await stop.wait()
+            await drain(server)
+            lag_task.cancel()
+            if status_task:
+                report(len(active_sessions), draining)
+                status_task.cancel()
     except Exception as ex:
         print("Failed to start websocket service",ex)
 
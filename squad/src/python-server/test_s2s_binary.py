@@ -0,0 +1,24 @@
+import pytest
+
+from s2s_binary import AUDIO_INPUT_FRAME, AUDIO_OUTPUT_FRAME, MAX_CONTENT_NAME_BYTES, decode_audio_frame, encode_audio_frame
+
+
+def test_audio_frame_round_trip():
+    pcm = bytes(range(16))
+    frame_type, content_name, decoded = decode_audio_frame(encode_audio_frame(AUDIO_INPUT_FRAME, "audio-1", pcm))
+    assert (frame_type, content_name, bytes(decoded)) == (AUDIO_INPUT_FRAME, "audio-1", pcm)
+
+
+def test_content_name_at_limit_is_encoded():
+    name = "a" * MAX_CONTENT_NAME_BYTES
+    assert decode_audio_frame(encode_audio_frame(AUDIO_OUTPUT_FRAME, name, b"\x00\x00"))[1] == name
+
+
+def test_content_name_over_limit_raises_value_error():
+    with pytest.raises(ValueError, match="400 bytes"):
+        encode_audio_frame(AUDIO_OUTPUT_FRAME, "a" * 400, b"\x00\x00")
+
+
+def test_multibyte_content_name_is_measured_in_bytes():
+    with pytest.raises(ValueError):
+        encode_audio_frame(AUDIO_OUTPUT_FRAME, "é" * 128, b"")
@@ -0,0 +1,59 @@
+import asyncio
+
+from s2s_queues import OutputEventQueue
+
+
+def text_output(content, content_id="c1", role="ASSISTANT"):
+    return {"event": {"textOutput": {"contentId": content_id, "role": role, "content": content}}}
+
+
+def queued_contents(queue):
+    return [item["event"]["textOutput"]["content"] for item in queue._queue]
+
+
+def test_text_is_not_coalesced_while_queue_has_room():
+    async def run():
+        queue = OutputEventQueue(maxsize=10)
+        await queue.put(text_output("Hello"))
+        await queue.put(text_output(" world"))
+        return queue
+
+    queue = asyncio.run(run())
+    assert queued_contents(queue) == ["Hello", " world"]
+    assert queue.stats["coalesced"] == 0
+
+
+def test_text_is_coalesced_when_queue_is_full():
+    async def run():
+        queue = OutputEventQueue(maxsize=2)
+        await queue.put(text_output("one"))
+        await queue.put(text_output(" two"))
+        await queue.put(text_output(" three"))
+        return queue
+
+    queue = asyncio.run(run())
+    assert queued_contents(queue) == ["one", " two three"]
+    assert queue.stats["coalesced"] == 1
+
+
+def test_interrupted_marker_is_never_coalesced():
+    async def run():
+        queue = OutputEventQueue(maxsize=2)
+        await queue.put(text_output("Sure, the turbine"))
+        await queue.put(text_output(" is"))
+        # Full: the marker must wait for space rather than be appended to queued text
+        put = asyncio.create_task(queue.put(text_output('{ "interrupted" : true }')))
+        await asyncio.sleep(0)
+        assert not put.done()
+        queue.get_nowait()
+        await put
+        # Nor may later text be appended to the queued marker
+        put = asyncio.create_task(queue.put(text_output(" spinning")))
+        await asyncio.sleep(0)
+        assert not put.done()
+        put.cancel()
+        return queue
+
+    queue = asyncio.run(run())
+    assert queued_contents(queue) == [" is", '{ "interrupted" : true }']
+    assert queue.stats["coalesced"] == 0
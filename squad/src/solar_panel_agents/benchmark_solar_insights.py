@@ -0,0 +1,57 @@
+"""Latency comparison of the two SolarInsights_Tool modes.
+
+Calls the tool for each address in 'direct' mode (geocode then solar_insights on the MCP
+server) and in 'agent' mode (an inline LLM agent that calls the same tools), and reports
+per-mode latency. Needs the solar MCP server running (solar_panel/src/mcp/solar_server.py)
+and Bedrock access for the agent mode.
+
+    python -m solar_panel_agents.benchmark_solar_insights --rounds 3
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from solar_panel_agents.solar_insights_tool import (get_solar_insights_direct, get_solar_insights_with_agent,
+                                                    solar_insights_mcp_pool)
+
+ADDRESSES = [
+    '1300, Westborough Ln, Leander, TX-78641',
+    '1364, Brome Dr, Leander, TX-78641',
+]
+
+MODES = {
+    'direct': get_solar_insights_direct,
+    'agent': get_solar_insights_with_agent,
+}
+
+
+async def run_mode(fn, addresses, rounds):
+    """Latencies in ms of sequential calls, after one warm-up call that opens the pooled connection"""
+    await fn(addresses[0])
+    latencies = []
+    for _ in range(rounds):
+        for address in addresses:
+            started = time.perf_counter()
+            await fn(address)
+            latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare direct MCP calls with the inline agent for solar insights')
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+    parser.add_argument('--address', action='append', help='Address to look up (repeatable)')
+    args = parser.parse_args()
+    addresses = args.address or ADDRESSES
+
+    print(f"{'mode':>8} {'calls':>6} {'mean ms':>9} {'p50 ms':>9} {'max ms':>9}")
+    for mode in args.modes:
+        latencies = asyncio.run(run_mode(MODES[mode], addresses, args.rounds))
+        print(f"{mode:>8} {len(latencies):>6} {statistics.mean(latencies):>9.0f} "
+              f"{statistics.median(latencies):>9.0f} {max(latencies):>9.0f}")
+    solar_insights_mcp_pool.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+import asyncio
+import atexit
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable
+
+from InlineAgent.tools.mcp import MCPHttp
+
+MCP_POOL_SIZE = int(os.environ.get('solar_insights_mcp_pool_size', '2'))
+# Ping a connection before use when it has been idle this long
+MCP_HEALTH_CHECK_SECONDS = float(os.environ.get('solar_insights_mcp_health_check_seconds', '30'))
+MCP_PING_TIMEOUT_SECONDS = float(os.environ.get('solar_insights_mcp_ping_timeout_seconds', '2'))
+
+
+class MCPConnection:
+    """One MCP client plus whatever was built on top of it (action group, agent)"""
+
+    def __init__(self, client, resources, last_used, closing, owner):
+        self.client = client
+        self.resources = resources
+        self.last_used = last_used
+        self.closing = closing  # Set to have the owner task close the client
+        self.owner = owner
+
+
+class MCPClientPool:
+    """
+    Long-lived MCP SSE connections shared by all sessions.
+
+    MCP connections belong to the event loop that opened them, while tools run on whichever
+    loop the calling agent uses (SupervisorAgent runs each team agent under its own
+    asyncio.run). The pool therefore owns a background event loop: connections, and the
+    objects build_resources() builds on them, are created once there, and run() submits work
+    to it. Idle connections are pinged before use; broken ones are reconnected and the call
+    is retried once.
+    """
+
+    def __init__(self, url: str, build_resources: Callable[[Any], Any] = lambda client: None,
+                 size: int = MCP_POOL_SIZE, health_check_seconds: float = MCP_HEALTH_CHECK_SECONDS):
+        self.url = url
+        self.build_resources = build_resources
+        self.size = size
+        self.health_check_seconds = health_check_seconds
+        self.stats = {"calls": 0, "connects": 0, "reconnects": 0, "failed_pings": 0}
+        self._loop = None
+        self._idle = None
+        self._connections = []
+        self._running = set()  # _run tasks on the pool loop
+        self._start_lock = threading.Lock()
+
+    def _ensure_loop(self):
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='mcp-client-pool', daemon=True).start()
+                self._loop = loop
+                atexit.register(self.close)
+        return self._loop
+
+    async def _own(self, ready: asyncio.Future, closing: asyncio.Event):
+        # The SSE client's task group must be exited by the task that entered it, so one task
+        # opens the connection, keeps it while in use and closes it
+        try:
+            client = await MCPHttp.create(url=self.url)
+        except BaseException as e:
+            ready.set_exception(e)
+            return
+        ready.set_result(client)
+        try:
+            await closing.wait()
+        finally:
+            try:
+                await client.cleanup()
+            except Exception as e:
+                print(f"Closing MCP connection to {self.url} failed: {e}")
+
+    async def _connect(self) -> MCPConnection:
+        ready = asyncio.get_running_loop().create_future()
+        closing = asyncio.Event()
+        owner = asyncio.create_task(self._own(ready, closing))
+        client = await ready
+        self.stats["connects"] += 1
+        return MCPConnection(client, self.build_resources(client), time.monotonic(), closing, owner)
+
+    async def _disconnect(self, connection: MCPConnection):
+        connection.closing.set()
+        try:
+            await asyncio.wait_for(connection.owner, 5)
+        except Exception as e:
+            print(f"Closing MCP connection to {self.url} failed: {e}")
+
+    async def _checkout(self) -> MCPConnection:
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for _ in range(self.size):
+                self._idle.put_nowait(None)  # Connected lazily on first use
+        connection = await self._idle.get()
+        try:
+            if connection is None:
+                connection = await self._connect()
+                self._connections.append(connection)
+            elif time.monotonic() - connection.last_used > self.health_check_seconds and not await self._healthy(connection):
+                connection = await self._replace(connection)
+        except BaseException:
+            self._idle.put_nowait(None)
+            raise
+        return connection
+
+    async def _healthy(self, connection: MCPConnection) -> bool:
+        try:
+            await asyncio.wait_for(connection.client.session.send_ping(), MCP_PING_TIMEOUT_SECONDS)
+            return True
+        except Exception:
+            self.stats["failed_pings"] += 1
+            return False
+
+    async def _replace(self, connection: MCPConnection) -> MCPConnection:
+        """Drop a broken connection and open a new one in its place"""
+        self._connections.remove(connection)
+        await self._disconnect(connection)
+        self.stats["reconnects"] += 1
+        replacement = await self._connect()
+        self._connections.append(replacement)
+        return replacement
+
+    async def _run(self, fn: Callable[[MCPConnection], Awaitable[Any]]):
+        self.stats["calls"] += 1
+        task = asyncio.current_task()
+        self._running.add(task)
+        try:
+            return await self._run_checked_out(fn)
+        finally:
+            self._running.discard(task)
+
+    async def _run_checked_out(self, fn: Callable[[MCPConnection], Awaitable[Any]]):
+        connection = await self._checkout()
+        try:
+            try:
+                return await fn(connection)
+            except Exception as e:
+                if await self._healthy(connection):
+                    raise
+                # The server went away under this connection; retry once on a fresh one
+                print(f"MCP connection to {self.url} lost, reconnecting: {e}")
+                broken, connection = connection, None
+                connection = await self._replace(broken)
+                return await fn(connection)
+        finally:
+            if connection is not None:
+                connection.last_used = time.monotonic()
+            self._idle.put_nowait(connection)
+
+    async def run(self, fn: Callable[[MCPConnection], Awaitable[Any]]):
+        """Run fn(connection) on the pool's loop with a checked-out connection; awaitable from any loop"""
+        future = asyncio.run_coroutine_threadsafe(self._run(fn), self._ensure_loop())
+        return await asyncio.wrap_future(future)
+
+    def close(self):
+        with self._start_lock:
+            loop, self._loop = self._loop, None
+        if loop is None or not loop.is_running():
+            return
+
+        async def close_all():
+            # Stop calls still in flight first, so they return their connections before the queue goes
+            running = list(self._running)
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+            for connection in list(self._connections):
+                await self._disconnect(connection)
+            self._connections.clear()
+            self._idle = None
+
+        try:
+            asyncio.run_coroutine_threadsafe(close_all(), loop).result(timeout=5)
+        except Exception as e:
+            print(f"Closing MCP client pool for {self.url} failed: {e!r}")
+        loop.call_soon_threadsafe(loop.stop)
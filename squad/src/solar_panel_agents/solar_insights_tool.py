@@ -1,6 +1,9 @@
 from agent_squad.utils import AgentTools, AgentTool
 from dotenv import load_dotenv
 import os
+import json
+import time
+import uuid
 
 from InlineAgent.tools.mcp import MCPHttp, MCPStdio
 from mcp import StdioServerParameters
@@ -8,34 +11,79 @@ from mcp import StdioServerParameters
 from InlineAgent.action_group import ActionGroup
 from InlineAgent.agent import InlineAgent
 from InlineAgent import AgentAppConfig
+from solar_panel_agents.mcp_client_pool import MCPClientPool
 from agent_squad.types import ConversationMessage, ParticipantRole
 from typing import List, Dict, Any
 
 config = AgentAppConfig()
 
+SOLAR_INSIGHTS_MCP_URL = os.environ.get('solar_insights_mcp_url', 'http://localhost:8000/sse')
+# 'direct' calls the geocode and solar_insights MCP tools in sequence; 'agent' has an inline LLM agent call them
+SOLAR_INSIGHTS_MODE = os.environ.get('solar_insights_mode', 'direct').lower()
+
+def build_solar_insights_agent(solar_insights_mcp_client):
+    """Action group and inline agent for one pooled MCP connection, built once and reused"""
+    solar_insights_action_group = ActionGroup(
+        name="SolarInsightsGroup",
+        mcp_clients=[solar_insights_mcp_client],
+    )
+    return InlineAgent(
+        # foundation_model="amazon.nova-pro-v1:0", # unable to provide proper inputs to the tools. It complains about input mismatch and not able to translate user inputs into pydantic objects. Claude can do it.
+        foundation_model=os.environ.get('solar_insights_mcp_tool_llm', 'anthropic.claude-3-haiku-20240307-v1:0'),
+        instruction="""You are a friendly assistant that is responsible for resolving user queries related to Solar insights and potential based on a given address. Keep the response short and to the point within in 5 sentences long that is easy for any speech assistant to respond to the user""",
+        agent_name="solar_insights_agent",
+        action_groups=[
+            solar_insights_action_group,
+        ],
+    )
+
+# Long-lived MCP connections to the solar insights server, shared by all sessions
+solar_insights_mcp_pool = MCPClientPool(SOLAR_INSIGHTS_MCP_URL, build_resources=build_solar_insights_agent)
+
+def parse_tool_result(result) -> dict:
+    """JSON dict returned by a solar_server tool"""
+    text = "".join(content.text for content in result.content if getattr(content, 'type', None) == 'text')
+    if result.isError:
+        return {"error": text or "MCP tool error"}
+    return json.loads(text) if text else {"error": "Empty MCP tool response"}
+
+async def get_solar_insights_direct(address:str) -> str:
+    """Call geocode and then solar_insights on the MCP server, without an LLM in between"""
+    async def invoke(connection):
+        session = connection.client.session
+        location = parse_tool_result(await session.call_tool("geocode", {"params": {"address": address}}))
+        if "error" in location:
+            return location
+        location = location["output"]
+        insights = parse_tool_result(await session.call_tool("solar_insights", {"params": {
+            "latitude": location["latitude"],
+            "longitude": location["longitude"],
+        }}))
+        return {"address": location["formatted_address"], **insights}
+
+    return json.dumps(await solar_insights_mcp_pool.run(invoke))
+
+async def get_solar_insights_with_agent(address:str) -> str:
+    """Let the inline agent (an LLM loop) pick and call the MCP tools"""
+    async def invoke(connection):
+        # A fresh session per call, so addresses asked by different users never share agent context
+        return await connection.resources.invoke(
+            input_text=f"What is the solar potential insights for the address {address}?",
+            session_id=str(uuid.uuid4()),
+        )
+
+    return await solar_insights_mcp_pool.run(invoke)
+
 async def get_solar_insights(address:str):
-    solar_insights_mcp_client = await MCPHttp.create(url="http://localhost:8000/sse")
     print("Invoked Solar Insights MCP Tool here")
+    started = time.perf_counter()
 
-    try:
-        solar_insights_action_group = ActionGroup(
-            name="SolarInsightsGroup",
-            mcp_clients=[solar_insights_mcp_client],
-        )
-        response = await InlineAgent(
-            # foundation_model="amazon.nova-pro-v1:0", # unable to provide proper inputs to the tools. It complains about input mismatch and not able to translate user inputs into pydantic objects. Claude can do it.
-            foundation_model=os.environ.get('solar_insights_mcp_tool_llm', 'anthropic.claude-3-haiku-20240307-v1:0'),
-            instruction="""You are a friendly assistant that is responsible for resolving user queries related to Solar insights and potential based on a given address. Keep the response short and to the point within in 5 sentences long that is easy for any speech assistant to respond to the user""",
-            agent_name="solar_insights_agent",
-            action_groups=[
-                solar_insights_action_group,
-            ],
-        ).invoke(
-            input_text=f"What is the solar potential insights for the address {address}?"
-        )
-    finally:
-        await solar_insights_mcp_client.cleanup()
+    if SOLAR_INSIGHTS_MODE == 'agent':
+        response = await get_solar_insights_with_agent(address)
+    else:
+        response = await get_solar_insights_direct(address)
 
+    print(f"Solar Insights Tool ({SOLAR_INSIGHTS_MODE}) took {(time.perf_counter() - started) * 1000:.0f} ms")
     print("Solar Insights Tool Response: ", response)
     return response
 
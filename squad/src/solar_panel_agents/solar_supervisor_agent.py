@@ -14,6 +14,7 @@ from agent_squad.orchestrator import AgentSquad, AgentSquadConfig
 import json
 from typing import List, Optional, Dict
 import logging
+from energy_agents.planner_supervisor import PlannerSupervisorAgent, PLANNER_MODE
 from solar_panel_agents.solar_insights_tool import solar_insights_tools, bedrock_solar_insights_tool_handler
 
 logger = logging.getLogger(__name__)
@@ -48,27 +49,33 @@ solar_insights_agent = BedrockLLMAgent(BedrockLLMAgentOptions(
     }
 ))
 
-supervisor = SupervisorAgent(SupervisorAgentOptions(
-    name="Solar Panel Supervisor Agent",
-    description=(
-        "You are a team supervisor managing a Solar Panel Catalog Agent and a Electricity Utility Bill Image Analysis Agent. "
-        "For Solar Panel cost savings given current electricity bill amount due, cleaning tips, troubleshooting, maintenance, and general information about Solar Panel, use Solar Panel Catalog Agent. This agent knows how to calculate the cost savings based on the monthly electricity cost along with cleaning tips, troubleshooting, maintenance, and general information about Solar Panel. Consult Electricity Utility Bill Image Analysis Agent to get the monthly electricity cost. DO NOT expect user to provide the monthly electricity cost or any sort of confirmation."
-        "For extracting electricity bill amount due given a company's name, use Electricity Utility Bill Image Analysis Agent. This agent knows how to fetch the monthly electricity bill amount due for a given company name. Do Not expect user to provide the montly electricity cost or any sort of confirmation."
-        "For Solar Insights, use Solar Insights Agent. This agent knows how to provide solar potential insights for a given address. The response should contain max number of solar panels that can be installed, median solar panel configuration, roof orientation, annual carbon offset, and average sun light hours, and any other relevant information."
-        "Keep the response short and to the point within in 5 to 8 sentences long that is easy for any speech assistant to respond to the user"
-    ),
-    lead_agent=BedrockLLMAgent(BedrockLLMAgentOptions(
-        name="LeadSolarPanelSupervisorAgent",
-        description="You are a supervisor agent. You are responsible for managing the flow of the conversation. You are only allowed to manage the flow of the conversation. Keep the response short, concise and within 5 to 8 sentences long. You are not allowed to answer questions about anything else.",
-        model_id=os.environ.get('solar_supervisor_lead_agent_llm', 'anthropic.claude-3-5-sonnet-20240620-v1:0'),
-        custom_system_prompt={
-            'template': 'Keep the response short and to the point within in 5 to 8 sentences long that is easy for any speech assistant to respond to the user.'
-        }
-    )),
-    team=[solar_panel_catalog_agent, electricity_utility_bill_image_analysis_agent, solar_insights_agent],
-    trace=True,
-    storage=memory_storage
-))
+def create_supervisor(storage=None, planner=PLANNER_MODE):
+    """Build a supervisor with its own lead agent; the team agents are shared and stateless.
+    With planner, independent team calls are planned up front and run concurrently."""
+    supervisor_class = PlannerSupervisorAgent if planner else SupervisorAgent
+    return supervisor_class(SupervisorAgentOptions(
+        name="Solar Panel Supervisor Agent",
+        description=(
+            "You are a team supervisor managing a Solar Panel Catalog Agent and a Electricity Utility Bill Image Analysis Agent. "
+            "For Solar Panel cost savings given current electricity bill amount due, cleaning tips, troubleshooting, maintenance, and general information about Solar Panel, use Solar Panel Catalog Agent. This agent knows how to calculate the cost savings based on the monthly electricity cost along with cleaning tips, troubleshooting, maintenance, and general information about Solar Panel. Consult Electricity Utility Bill Image Analysis Agent to get the monthly electricity cost. DO NOT expect user to provide the monthly electricity cost or any sort of confirmation."
+            "For extracting electricity bill amount due given a company's name, use Electricity Utility Bill Image Analysis Agent. This agent knows how to fetch the monthly electricity bill amount due for a given company name. Do Not expect user to provide the montly electricity cost or any sort of confirmation."
+            "For Solar Insights, use Solar Insights Agent. This agent knows how to provide solar potential insights for a given address. The response should contain max number of solar panels that can be installed, median solar panel configuration, roof orientation, annual carbon offset, and average sun light hours, and any other relevant information."
+            "Keep the response short and to the point within in 5 to 8 sentences long that is easy for any speech assistant to respond to the user"
+        ),
+        lead_agent=BedrockLLMAgent(BedrockLLMAgentOptions(
+            name="LeadSolarPanelSupervisorAgent",
+            description="You are a supervisor agent. You are responsible for managing the flow of the conversation. You are only allowed to manage the flow of the conversation. Keep the response short, concise and within 5 to 8 sentences long. You are not allowed to answer questions about anything else.",
+            model_id=os.environ.get('solar_supervisor_lead_agent_llm', 'anthropic.claude-3-5-sonnet-20240620-v1:0'),
+            custom_system_prompt={
+                'template': 'Keep the response short and to the point within in 5 to 8 sentences long that is easy for any speech assistant to respond to the user.'
+            }
+        )),
+        team=[solar_panel_catalog_agent, electricity_utility_bill_image_analysis_agent, solar_insights_agent],
+        trace=True,
+        storage=storage or memory_storage
+    ))
+
+supervisor = create_supervisor()
 
 async def handle_request(_orchestrator: AgentSquad, _user_input:str, _user_id:str, _session_id:str):
     classifier_result=ClassifierResult(selected_agent=supervisor, confidence=1.0)
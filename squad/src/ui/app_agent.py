@@ -14,6 +14,9 @@ from agent_squad.storage import InMemoryChatStorage
 from agent_squad.orchestrator import AgentSquad, AgentSquadConfig
 from wind_turbine_agents.turbine_supervisor_agent import supervisor as turbine_supervisor_agent
 from solar_panel_agents.solar_supervisor_agent import supervisor as solar_supervisor_agent
+from energy_agents.local_classifier import LocalPreClassifier
+from energy_agents.sticky_routing import StickyRouter
+from energy_agents.answer_cache import SemanticAnswerCache, with_answer_cache
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -33,7 +36,10 @@ custom_bedrock_classifier = BedrockClassifier(BedrockClassifierOptions(
     }
 ))
 
-orchestrator = AgentSquad(classifier=custom_bedrock_classifier, storage=memory_storage,
+# Route confident requests locally and only ask the LLM classifier about the rest
+local_classifier = LocalPreClassifier(custom_bedrock_classifier)
+
+orchestrator = AgentSquad(classifier=local_classifier, storage=memory_storage,
     options=AgentSquadConfig(
         LOG_AGENT_CHAT=True,
         LOG_CLASSIFIER_CHAT=True,
@@ -44,8 +50,14 @@ orchestrator = AgentSquad(classifier=custom_bedrock_classifier, storage=memory_s
     )
 )
 
-orchestrator.add_agent(turbine_supervisor_agent)
-orchestrator.add_agent(solar_supervisor_agent)
+# Repeated knowledge-base questions are answered from memory, per supervisor and knowledge base version
+answer_cache = SemanticAnswerCache()
+
+orchestrator.add_agent(with_answer_cache(turbine_supervisor_agent, answer_cache))
+orchestrator.add_agent(with_answer_cache(solar_supervisor_agent, answer_cache))
+
+# Keeps the supervisor of the previous turn for follow-ups
+sticky_router = StickyRouter()
 
 USER_ID = str(uuid.uuid4())
 SESSION_ID = str(uuid.uuid4())
@@ -146,7 +158,8 @@ async def run_query(_orchestrator: AgentSquad, _user_input:str, _user_id:str, _s
     try:
         # Initialize placeholders for status updates
         # response = await handle_ui_request(_user_input, _user_id, _session_id)
-        response:AgentResponse = await _orchestrator.route_request(
+        response:AgentResponse = await sticky_router.route_request(
+            _orchestrator,
             _user_input,
             _user_id,
             _session_id
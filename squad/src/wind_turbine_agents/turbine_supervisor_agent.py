@@ -14,6 +14,7 @@ from agent_squad.orchestrator import AgentSquad, AgentSquadConfig
 import json
 from typing import List, Optional, Dict
 import logging
+from energy_agents.planner_supervisor import PlannerSupervisorAgent, PLANNER_MODE
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -36,30 +37,36 @@ turbine_image_agent = LambdaAgent(LambdaAgentOptions(
     function_region='us-east-1',
 ))
 
-supervisor = SupervisorAgent(SupervisorAgentOptions(
-    name="Wind Turbine Supervisor Agent",
-    description=(
-        "You are a team supervisor managing a Turbine Catalog Agent and a Turbine Image Analysis Agent. "
-        "For Turbine details, performance metrics, troubleshooting related queries, use Wind Turbine Catalog Agent. "
-        "For Turbine foundation related queries, use Wind Turbine Image Analysis Agent. This agent knows how to fetch the relevant image from S3 bucket for a turbine. Do not expect user to provide the image."
-        "Keep the response short and to the point within in 5 sentences long that is easy for any speech assistant to respond to the user"
-    ),
-    lead_agent=BedrockLLMAgent(BedrockLLMAgentOptions(
-        name="LeadTurbineSupervisorAgent",
-        description="You are a supervisor agent. You are responsible for managing the flow of the conversation. You are only allowed to manage the flow of the conversation. You are not allowed to answer questions about anything else. DO NOT suggest any follow up questions. Keep the response short, concise and within 5 sentences long",
-        model_id=os.environ.get('turbine_supervisor_lead_agent_llm', 'anthropic.claude-3-5-sonnet-20240620-v1:0'),
-        custom_system_prompt={
-            'template': 'Keep the response short and to the point within in 5 sentences long that is easy for any speech assistant to respond to the user'
-        },
-        guardrail_config={
-            'guardrailIdentifier': 'zx24scgaszcw',
-            'guardrailVersion': 'DRAFT'
-        },
-    )),
-    team=[turbine_catalog_agent, turbine_image_agent],
-    trace=True,
-    storage=memory_storage
-))
+def create_supervisor(storage=None, planner=PLANNER_MODE):
+    """Build a supervisor with its own lead agent; the team agents are shared and stateless.
+    With planner, independent team calls are planned up front and run concurrently."""
+    supervisor_class = PlannerSupervisorAgent if planner else SupervisorAgent
+    return supervisor_class(SupervisorAgentOptions(
+        name="Wind Turbine Supervisor Agent",
+        description=(
+            "You are a team supervisor managing a Turbine Catalog Agent and a Turbine Image Analysis Agent. "
+            "For Turbine details, performance metrics, troubleshooting related queries, use Wind Turbine Catalog Agent. "
+            "For Turbine foundation related queries, use Wind Turbine Image Analysis Agent. This agent knows how to fetch the relevant image from S3 bucket for a turbine. Do not expect user to provide the image."
+            "Keep the response short and to the point within in 5 sentences long that is easy for any speech assistant to respond to the user"
+        ),
+        lead_agent=BedrockLLMAgent(BedrockLLMAgentOptions(
+            name="LeadTurbineSupervisorAgent",
+            description="You are a supervisor agent. You are responsible for managing the flow of the conversation. You are only allowed to manage the flow of the conversation. You are not allowed to answer questions about anything else. DO NOT suggest any follow up questions. Keep the response short, concise and within 5 sentences long",
+            model_id=os.environ.get('turbine_supervisor_lead_agent_llm', 'anthropic.claude-3-5-sonnet-20240620-v1:0'),
+            custom_system_prompt={
+                'template': 'Keep the response short and to the point within in 5 sentences long that is easy for any speech assistant to respond to the user'
+            },
+            guardrail_config={
+                'guardrailIdentifier': 'zx24scgaszcw',
+                'guardrailVersion': 'DRAFT'
+            },
+        )),
+        team=[turbine_catalog_agent, turbine_image_agent],
+        trace=True,
+        storage=storage or memory_storage
+    ))
+
+supervisor = create_supervisor()
 
 async def handle_request(_orchestrator: AgentSquad, _user_input:str, _user_id:str, _session_id:str):
     classifier_result=ClassifierResult(selected_agent=supervisor, confidence=1.0)
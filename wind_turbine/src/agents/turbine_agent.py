@@ -4,6 +4,7 @@ import json
 import uuid
 from src.helper.bedrock_agent_helper import AgentsForAmazonBedrock
 from src.helper.knowledge_base_helper import KnowledgeBasesForAmazonBedrock
+from src.helper.client_factory import get_client
 
 # Initialize the helper
 agents = AgentsForAmazonBedrock()
@@ -25,7 +26,7 @@ optimization_table = 'WT_Asset_Optimization'
 dynamoDB_args = [optimization_table, 'turbine_id', 'assessed_date']
 
 # Get AWS account ID and region
-account_id = boto3.client("sts").get_caller_identity()["Account"]
+account_id = get_client("sts").get_caller_identity()["Account"]
 region = agents.get_region()
 
 knowledge_base_name = f'{turbine_agent_name}-kb'
@@ -41,7 +42,7 @@ kb_id, ds_id = kb.create_or_retrieve_knowledge_base(
 print(f"Knowledge Base ID: {kb_id}")
 print(f"Data Source ID: {ds_id}")
 
-s3_client = boto3.client('s3', region)
+s3_client = get_client('s3', region)
 
 def upload_directory(path, bucket_name):
     for root,dirs,files in os.walk(path):
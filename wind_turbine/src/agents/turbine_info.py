@@ -2,10 +2,18 @@ import boto3
 import json
 import os
 from boto3.dynamodb.conditions import Key, Attr
+from botocore.config import Config
 from datetime import datetime
 
+# Tuned connection pool, keep-alive and adaptive retries, reused across warm invocations
+client_config = Config(
+    max_pool_connections=int(os.environ.get('boto_max_pool_connections', '50')),
+    tcp_keepalive=True,
+    retries={'mode': 'adaptive', 'max_attempts': int(os.environ.get('boto_max_attempts', '5'))}
+)
+
 # Initialize DynamoDB resource
-dynamodb_resource = boto3.resource('dynamodb')
+dynamodb_resource = boto3.resource('dynamodb', config=client_config)
 catalog_table = os.getenv('catalog_table', 'WT_Catalog')
 optimization_table = os.getenv('optimization_table', 'WT_Asset_Optimization')
 
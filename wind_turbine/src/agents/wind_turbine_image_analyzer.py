@@ -2,19 +2,43 @@ import base64
 import boto3
 import json
 import os
-import tempfile
+import hashlib
+import re
+import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
+from botocore.exceptions import ClientError
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# Tuned connection pool, keep-alive and adaptive retries, reused across warm invocations.
+# Adaptive mode also rate-limits the client under throttling, so model calls have no retry layer of their own
+client_config = Config(
+    max_pool_connections=int(os.environ.get('boto_max_pool_connections', '50')),
+    tcp_keepalive=True,
+    retries={'mode': 'adaptive', 'max_attempts': int(os.environ.get('boto_max_attempts', '5'))}
+)
+
 # Initialize clients
-bedrock_runtime = boto3.client('bedrock-runtime', region_name='us-east-1')
-s3_client = boto3.client('s3')
+bedrock_runtime = boto3.client('bedrock-runtime', region_name='us-east-1', config=client_config)
+s3_client = boto3.client('s3', config=client_config)
 
 # environment variables
 bucket = os.environ.get('wind_turbine_image_bucket')
 modelId = os.environ.get('wind_turbine_image_llm', 'amazon.nova-lite-v1:0')
+image_cache_revalidate_seconds = int(os.environ.get('image_cache_revalidate_seconds', '300'))
+analysis_model_id = os.environ.get('wind_turbine_image_analysis_llm', 'amazon.nova-lite-v1:0')
+analysis_cache_ttl_seconds = int(os.environ.get('analysis_cache_ttl_seconds', '86400'))
+analysis_cache_table = os.environ.get('analysis_cache_table')
+analysis_cache_file = os.environ.get('analysis_cache_file')
+image_variant_min_psnr = float(os.environ.get('image_variant_min_psnr', '32'))
+batch_max_concurrency = int(os.environ.get('batch_max_concurrency', '4'))
+
+# Bump whenever the analysis system prompt or instructions change
+prompt_version = 'v1'
 
 # Image mapping dictionary
 wind_turbine_images = {
@@ -25,23 +49,234 @@ wind_turbine_images = {
     "WT-035": "wind_turbine_grout_spalling.png"
 }
 
+# Warm-container S3 object cache: S3 key -> {"etag", "body", "validated_at"}
+s3_object_cache = {}
+
+# Warm-container image cache: turbine ID -> {"s3_key", "etag", "format", "base64"}
+image_cache = {}
+
+# Pre-resized variant manifest for the analysis model, see helper/image_variants.py
+variant_manifest = {"variants": None, "loaded_at": 0}
+
+def get_cached_object(s3_key):
+    """Return the cached S3 object, revalidating it against S3 by ETag"""
+    cached = s3_object_cache.get(s3_key)
+    if cached and time.time() - cached["validated_at"] < image_cache_revalidate_seconds:
+        return cached
+
+    request = {
+        "Bucket": bucket,
+        "Key": s3_key
+    }
+    if cached:
+        request["IfNoneMatch"] = cached["etag"]
+
+    try:
+        response = s3_client.get_object(**request)
+    except ClientError as e:
+        # S3 answers a matching If-None-Match with 304 Not Modified
+        if cached and e.response.get('Error', {}).get('Code') in ('304', 'NotModified'):
+            cached["validated_at"] = time.time()
+            return cached
+        raise
+
+    entry = {
+        "etag": response['ETag'],
+        "body": response['Body'].read(),
+        "validated_at": time.time()
+    }
+    s3_object_cache[s3_key] = entry
+    return entry
+
+def load_variant_manifest():
+    """Return the image variants published for the analysis model, or {} if there are none"""
+    if variant_manifest["variants"] is not None and time.time() - variant_manifest["loaded_at"] < image_cache_revalidate_seconds:
+        return variant_manifest["variants"]
+
+    try:
+        manifest = json.loads(get_cached_object('wind_turbine/images/variants/manifest.json')["body"])
+        variant_manifest["variants"] = manifest.get(analysis_model_id, {})
+    except ClientError as e:
+        logger.info(f"No image variant manifest available: {str(e)}")
+        variant_manifest["variants"] = {}
+    variant_manifest["loaded_at"] = time.time()
+    return variant_manifest["variants"]
+
+def select_image_variant(image_name):
+    """Pick the smallest pre-encoded variant that meets the quality target, else the original PNG"""
+    # Variants are listed smallest payload first
+    for variant in load_variant_manifest().get(image_name, []):
+        if variant["psnr"] >= image_variant_min_psnr:
+            return variant["key"], variant["format"], True
+    return f'wind_turbine/images/{image_name}', 'png', False
+
+def get_cached_image(image_key):
+    """Return the cached, base64 encoded image entry for a turbine"""
+    s3_key, image_format, pre_encoded = select_image_variant(wind_turbine_images[image_key])
+    s3_object = get_cached_object(s3_key)
+
+    cached = image_cache.get(image_key)
+    if cached and cached["s3_key"] == s3_key and cached["etag"] == s3_object["etag"]:
+        return cached
+
+    body = s3_object["body"]
+    entry = {
+        "s3_key": s3_key,
+        "etag": s3_object["etag"],
+        "format": image_format,
+        "base64": body.decode('utf-8') if pre_encoded else base64.b64encode(body).decode('utf-8')
+    }
+    image_cache[image_key] = entry
+    return entry
+
 def download_and_encode(image_key):
-    """Download image from S3 and return base64 encoded string"""
+    """Fetch image from S3 (or the warm-container cache) and return base64 encoded string"""
     try:
-        # bucket = 'handsonllms-raghu'
-        local_path = os.path.join(tempfile.gettempdir(), wind_turbine_images[image_key])
-        
-        # Download image from S3
-        s3_client.download_file(bucket, f'wind_turbine/images/{wind_turbine_images[image_key]}', local_path)
-        
-        # Encode to base64
-        with open(local_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode('utf-8')
-            
+        return get_cached_image(image_key)["base64"]
     except Exception as e:
         logger.error(f"Image processing error: {str(e)}")
         return None
 
+# Analysis result cache: in-memory tier plus an optional persistent tier
+# (DynamoDB table keyed by cache_key with TTL on expires_at, or a local JSON file)
+analysis_cache = {}
+dynamodb_resource = boto3.resource('dynamodb', config=client_config) if analysis_cache_table else None
+# The file tier is read, modified and rewritten whole; batch workers share it
+analysis_cache_file_lock = threading.Lock()
+
+def normalize_query(query):
+    """Lowercase the query and collapse punctuation and whitespace"""
+    return " ".join(re.findall(r'[a-z0-9]+', (query or '').lower()))
+
+def analysis_cache_key(image_etag, query, chat_history=None):
+    """Build the cache key from (image ETag, normalized query, chat history, model ID, prompt version);
+    the prompt includes the chat history, so an answer is only reused for the same conversation"""
+    key = json.dumps([image_etag, normalize_query(query), chat_history or [], analysis_model_id, prompt_version],
+                     sort_keys=True, default=str)
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+def load_analysis_cache_file():
+    if analysis_cache_file and os.path.exists(analysis_cache_file):
+        with open(analysis_cache_file) as f:
+            return json.load(f)
+    return {}
+
+def save_analysis_cache_file(entries):
+    # Write a temp file and swap it in, so readers never see a partly written file
+    temp_file = f"{analysis_cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_file, 'w') as f:
+        json.dump(entries, f)
+    os.replace(temp_file, analysis_cache_file)
+
+def get_cached_analysis(cache_key):
+    """Return a cached, unexpired analysis from the in-memory or persistent tier"""
+    now = time.time()
+    entry = analysis_cache.get(cache_key)
+    if entry and entry["expires_at"] > now:
+        return entry["analysis"]
+
+    try:
+        if dynamodb_resource:
+            item = dynamodb_resource.Table(analysis_cache_table).get_item(Key={"cache_key": cache_key}).get('Item')
+            entry = {"analysis": item["analysis"], "image_key": item["image_key"], "expires_at": float(item["expires_at"])} if item else None
+        elif analysis_cache_file:
+            with analysis_cache_file_lock:
+                entry = load_analysis_cache_file().get(cache_key)
+    except Exception as e:
+        logger.error(f"Analysis cache read error: {str(e)}")
+        entry = None
+
+    if entry and entry["expires_at"] > now:
+        analysis_cache[cache_key] = entry
+        return entry["analysis"]
+    return None
+
+def put_cached_analysis(cache_key, image_key, analysis):
+    """Store an analysis in the in-memory tier and, when configured, the persistent tier"""
+    entry = {"analysis": analysis, "image_key": image_key, "expires_at": time.time() + analysis_cache_ttl_seconds}
+    analysis_cache[cache_key] = entry
+
+    try:
+        if dynamodb_resource:
+            dynamodb_resource.Table(analysis_cache_table).put_item(Item={
+                "cache_key": cache_key,
+                "analysis": analysis,
+                "image_key": image_key,
+                "expires_at": int(entry["expires_at"])
+            })
+        elif analysis_cache_file:
+            with analysis_cache_file_lock:
+                entries = load_analysis_cache_file()
+                entries[cache_key] = entry
+                save_analysis_cache_file(entries)
+    except Exception as e:
+        logger.error(f"Analysis cache write error: {str(e)}")
+
+def invalidate_analysis_cache(image_key=None):
+    """Drop cached analyses for one image key, or all of them, from every tier"""
+    def matches(entry):
+        return image_key is None or entry.get("image_key") == image_key
+
+    stale_keys = [key for key, entry in list(analysis_cache.items()) if matches(entry)]
+    for key in stale_keys:
+        analysis_cache.pop(key, None)
+    removed = len(stale_keys)
+
+    try:
+        if dynamodb_resource:
+            table = dynamodb_resource.Table(analysis_cache_table)
+            scan_kwargs = {"ProjectionExpression": "cache_key, image_key"}
+            while True:
+                page = table.scan(**scan_kwargs)
+                with table.batch_writer() as batch:
+                    for item in page.get('Items', []):
+                        if matches(item):
+                            batch.delete_item(Key={"cache_key": item["cache_key"]})
+                if 'LastEvaluatedKey' not in page:
+                    break
+                scan_kwargs["ExclusiveStartKey"] = page['LastEvaluatedKey']
+        elif analysis_cache_file:
+            with analysis_cache_file_lock:
+                entries = load_analysis_cache_file()
+                save_analysis_cache_file({key: entry for key, entry in entries.items() if not matches(entry)})
+    except Exception as e:
+        logger.error(f"Analysis cache invalidation error: {str(e)}")
+
+    return removed
+
+# Deterministic turbine ID resolution, e.g. "WT-007", "wt 7", "turbine #7"
+turbine_id_pattern = re.compile(r'\b(?:WT|turbine)[\s#_-]*(\d{1,3})\b', re.IGNORECASE)
+
+# Fast-path resolver counters for the warm container
+id_resolver_stats = {"hits": 0, "misses": 0}
+
+def chat_history_texts(chat_history):
+    """Return the text of the chat history messages, most recent first"""
+    texts = []
+    for message in reversed(chat_history or []):
+        if isinstance(message, dict):
+            for block in message.get('content') or []:
+                if isinstance(block, dict) and block.get('text'):
+                    texts.append(block['text'])
+        elif message:
+            texts.append(str(message))
+    return texts
+
+def match_turbine_id(text):
+    """Return the first turbine ID in text as WT-XXX, normalizing only prefix, separator and zero-padding.
+    Catalog turbines without an image are returned as-is so callers report them instead of
+    substituting a similar-looking ID."""
+    match = turbine_id_pattern.search(text or '')
+    return f"WT-{int(match.group(1)):03d}" if match else None
+
+def resolve_turbine_id(query, chat_history):
+    """Resolve the turbine ID from the query, then the chat history, without a model call"""
+    for text in [query] + chat_history_texts(chat_history):
+        turbine_id = match_turbine_id(text)
+        if turbine_id:
+            return turbine_id
+    return None
+
 def extract_turbine_id(query, chat_history):
     """Use Nova Micro model to extract turbine ID from query"""
     try:
@@ -64,6 +299,111 @@ def extract_turbine_id(query, chat_history):
         logger.error(f"ID extraction error: {str(e)}")
         return None
 
+def analyze_image(turbine_id, base64_image, query, chat_history):
+    """Return the Nova Lite foundation analysis of a turbine image"""
+    # Create multimodal payload for Nova Lite
+    system_prompt = [{
+        "text": "You are a Wind Turbine Analysis Assistant. Analyze the provided image and query to identify foundation issues, structural problems of a wind turbine such as Grout Spalling, Grout Cracking, Pedestal Spalling, Pedestal cracks, Water in basement, hardware corrosion of nuts and bolts, soil cracking, etc. Only provide the issues thats seen in the image and DO NOT provide any recommendation to fix or maintenance instructions. The output should be brief, concise, and in less than 5 sentences."
+    }]
+
+    messages = [{
+        "role": "user",
+        "content": [
+            {
+                "image": {
+                    "format": image_cache[turbine_id]["format"],
+                    "source": {"bytes": base64_image}
+                }
+            },
+            {
+                "text": f"chat_history: {chat_history}\n\n  {query} Provide a detailed analysis in 5 sentences focusing on visible issues."
+            }
+        ]
+    }]
+
+    # Invoke Nova Lite model
+    response = bedrock_runtime.invoke_model(
+        modelId=analysis_model_id,
+        body=json.dumps({
+            "schemaVersion": "messages-v1",
+            "messages": messages,
+            "system": system_prompt,
+            "inferenceConfig": {
+                "maxTokens": 512,
+                "temperature": 0.2,
+                "topP": 0.9
+            }
+        })
+    )
+
+    # Parse model response
+    model_output = json.loads(response['body'].read())
+    return model_output['output']['message']['content'][0]['text']
+
+def analyze_turbine(turbine_id, query):
+    """Analyze one turbine for the batch report, serving repeat questions from the analysis cache"""
+    started = time.time()
+    result = {"turbine_id": turbine_id, "image_used": wind_turbine_images.get(turbine_id)}
+    try:
+        if turbine_id not in wind_turbine_images:
+            raise ValueError("No image available for turbine")
+        base64_image = get_cached_image(turbine_id)["base64"]
+        cache_key = analysis_cache_key(image_cache[turbine_id]["etag"], query)
+        analysis = get_cached_analysis(cache_key)
+        result["cached"] = analysis is not None
+        if analysis is None:
+            analysis = analyze_image(turbine_id, base64_image, query, [])
+            put_cached_analysis(cache_key, turbine_id, analysis)
+        result.update({"status": "succeeded", "response": analysis})
+    except Exception as e:
+        logger.error(f"Batch analysis error for turbine ID {turbine_id}: {str(e)}")
+        result.update({"status": "failed", "response": str(e)})
+    result["latency_ms"] = round((time.time() - started) * 1000, 1)
+    return result
+
+def batch_analyze_turbines(turbine_ids, query):
+    """Analyze several turbines, fetching images concurrently and bounding concurrent model calls"""
+    started = time.time()
+    if isinstance(turbine_ids, str):
+        turbine_ids = [turbine_ids]
+    # Only a missing or empty list means every turbine that has an image
+    requested_ids = turbine_ids or list(wind_turbine_images.keys())
+    query = query or "What foundational issues are observed with this turbine?"
+
+    # Normalize each requested ID exactly, analyze each turbine once, and report IDs that
+    # do not normalize as failed entries in request order
+    entries = []
+    for requested_id in requested_ids:
+        turbine_id = match_turbine_id(str(requested_id))
+        if turbine_id is None:
+            entries.append({"turbine_id": requested_id, "image_used": None, "status": "failed",
+                            "response": "Could not identify valid turbine ID", "latency_ms": 0.0})
+        elif turbine_id not in entries:
+            entries.append(turbine_id)
+    turbine_ids = [entry for entry in entries if isinstance(entry, str)]
+
+    # Warm the image cache for every turbine in parallel before the model calls
+    with ThreadPoolExecutor(max_workers=max(1, len(turbine_ids))) as executor:
+        list(executor.map(download_and_encode, [turbine_id for turbine_id in turbine_ids if turbine_id in wind_turbine_images]))
+
+    with ThreadPoolExecutor(max_workers=batch_max_concurrency) as executor:
+        analyses = dict(zip(turbine_ids, executor.map(lambda turbine_id: analyze_turbine(turbine_id, query), turbine_ids)))
+    results = [analyses[entry] if isinstance(entry, str) else entry for entry in entries]
+
+    elapsed = time.time() - started
+    latencies = sorted(result["latency_ms"] for result in results)
+    summary = {
+        "count": len(results),
+        "succeeded": sum(1 for result in results if result["status"] == "succeeded"),
+        "failed": sum(1 for result in results if result["status"] == "failed"),
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "throughput_per_sec": round(len(results) / elapsed, 2) if elapsed else None,
+        "p50_latency_ms": latencies[len(latencies) // 2] if latencies else None,
+        "max_latency_ms": latencies[-1] if latencies else None
+    }
+    logger.info(f"Batch analysis summary: {summary}")
+    return {"results": results, "summary": summary}
+
 def lambda_handler(event, context):
     try:
         # Parse input
@@ -71,10 +411,29 @@ def lambda_handler(event, context):
         query = event.get('query', '')
         chat_history = event.get('chatHistory', [])
         logger.info(f"chat_history: {chat_history}")
+
+        # Batch foundation report; a null or empty list analyzes every turbine that has an image
+        if 'turbine_ids' in event:
+            return {
+                "body": json.dumps(batch_analyze_turbines(event.get('turbine_ids'), query))
+            }
+
+        # Explicit cache invalidation, optionally scoped to one image key
+        if event.get('invalidateCache'):
+            removed = invalidate_analysis_cache(event.get('turbine_id'))
+            return {
+                "body": json.dumps({"response": f"Invalidated {removed} cached analyses"})
+            }
         
-        # Step 1: Extract turbine ID using Nova Micro
-        turbine_id = extract_turbine_id(query, chat_history)
-        logger.info(f"Extracted turbine ID: {turbine_id}")
+        # Step 1: Resolve turbine ID deterministically, fall back to Nova Micro on a miss
+        turbine_id = resolve_turbine_id(query, chat_history)
+        if turbine_id:
+            id_resolver_stats["hits"] += 1
+        else:
+            id_resolver_stats["misses"] += 1
+            turbine_id = extract_turbine_id(query, chat_history)
+            turbine_id = match_turbine_id(turbine_id) if turbine_id else None
+        logger.info(f"Extracted turbine ID: {turbine_id}, resolver stats: {id_resolver_stats}")
 
         if not turbine_id or turbine_id not in wind_turbine_images:
             return {
@@ -87,45 +446,24 @@ def lambda_handler(event, context):
             return {
                 "body": json.dumps({"response": "Error processing turbine image"})
             }
+
+        # Serve repeat questions about an unchanged image from the analysis cache
+        cache_key = analysis_cache_key(image_cache[turbine_id]["etag"], query, chat_history)
+        analysis = get_cached_analysis(cache_key)
+        if analysis:
+            logger.info(f"Analysis cache hit for turbine ID: {turbine_id}")
+            return {
+                "body": json.dumps({
+                    "response": analysis,
+                    "turbine_id": turbine_id,
+                    "image_used": wind_turbine_images[turbine_id],
+                    "cached": True
+                })
+            }
         
-        # Step 3: Create multimodal payload for Nova Lite
-        system_prompt = [{
-            "text": "You are a Wind Turbine Analysis Assistant. Analyze the provided image and query to identify foundation issues, structural problems of a wind turbine such as Grout Spalling, Grout Cracking, Pedestal Spalling, Pedestal cracks, Water in basement, hardware corrosion of nuts and bolts, soil cracking, etc. Only provide the issues thats seen in the image and DO NOT provide any recommendation to fix or maintenance instructions. The output should be brief, concise, and in less than 5 sentences."
-        }]
-        
-        messages = [{
-            "role": "user",
-            "content": [
-                {
-                    "image": {
-                        "format": "png",
-                        "source": {"bytes": base64_image}
-                    }
-                },
-                {
-                    "text": f"chat_history: {chat_history}\n\n  {query} Provide a detailed analysis in 5 sentences focusing on visible issues."
-                }
-            ]
-        }]
-        
-        # Invoke Nova Lite model
-        response = bedrock_runtime.invoke_model(
-            modelId="amazon.nova-lite-v1:0",
-            body=json.dumps({
-                "schemaVersion": "messages-v1",
-                "messages": messages,
-                "system": system_prompt,
-                "inferenceConfig": {
-                    "maxTokens": 512,
-                    "temperature": 0.2,
-                    "topP": 0.9
-                }
-            })
-        )
-        
-        # Parse model response
-        model_output = json.loads(response['body'].read())
-        analysis = model_output['output']['message']['content'][0]['text']
+        # Step 3: Analyze the image with Nova Lite
+        analysis = analyze_image(turbine_id, base64_image, query, chat_history)
+        put_cached_analysis(cache_key, turbine_id, analysis)
         
         return {
             "body": json.dumps({
@@ -45,6 +45,7 @@ import re
 from boto3.session import Session
 from botocore.config import Config
 from boto3.dynamodb.conditions import Key
+from src.helper.client_factory import get_client, get_resource
 import matplotlib.pyplot as plt
 import matplotlib.image as mpimg
 from IPython.display import display, Markdown
@@ -165,21 +166,20 @@ class AgentsForAmazonBedrock:
         """Constructs an instance."""
         self._boto_session = Session() 
         self._region = self._boto_session.region_name
-        self._account_id = boto3.client("sts").get_caller_identity()["Account"]
+        self._account_id = get_client("sts").get_caller_identity()["Account"]
 
-        self._bedrock_agent_client = boto3.client("bedrock-agent")
+        self._bedrock_agent_client = get_client("bedrock-agent")
 
-        long_invoke_time_config = Config(read_timeout=600)
-        self._bedrock_agent_runtime_client = boto3.client(
-            "bedrock-agent-runtime", config=long_invoke_time_config
+        self._bedrock_agent_runtime_client = get_client(
+            "bedrock-agent-runtime", read_timeout=600
         )
 
-        self._sts_client = boto3.client("sts")
-        self._iam_client = boto3.client("iam")
-        self._lambda_client = boto3.client("lambda")
-        self._s3_client = boto3.client("s3", region_name=self._region)
-        self._dynamodb_client = boto3.client('dynamodb', region_name=self._region)
-        self._dynamodb_resource = boto3.resource('dynamodb', region_name=self._region)
+        self._sts_client = get_client("sts")
+        self._iam_client = get_client("iam")
+        self._lambda_client = get_client("lambda")
+        self._s3_client = get_client("s3", region_name=self._region)
+        self._dynamodb_client = get_client('dynamodb', region_name=self._region)
+        self._dynamodb_resource = get_resource('dynamodb', region_name=self._region)
 
         self._suffix = f"{self._region}-{self._account_id}"
 
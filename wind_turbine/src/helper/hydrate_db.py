@@ -1,9 +1,9 @@
-import boto3
 import csv
 from botocore.exceptions import ClientError
+from src.helper.client_factory import get_resource
 
 # Initialize DynamoDB resource
-dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+dynamodb = get_resource('dynamodb', region_name='us-east-1')
 
 def create_wind_turbine_table():
     try:
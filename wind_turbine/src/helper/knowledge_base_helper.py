@@ -25,6 +25,7 @@ import json
 import boto3
 import time
 from botocore.exceptions import ClientError
+from src.helper.client_factory import get_client
 from opensearchpy import OpenSearch, RequestsHttpConnection, AWSV4SignerAuth, RequestError
 import pprint
 from retrying import retry
@@ -65,17 +66,13 @@ class KnowledgeBasesForAmazonBedrock:
         """
         boto3_session = boto3.session.Session()
         self.region_name = boto3_session.region_name
-        self.iam_client = boto3_session.client('iam',region_name=self.region_name)
-        self.account_number = boto3.client('sts',region_name=self.region_name).get_caller_identity().get('Account')
+        self.iam_client = get_client('iam',region_name=self.region_name)
+        self.account_number = get_client('sts',region_name=self.region_name).get_caller_identity().get('Account')
         self.suffix = random.randrange(200, 900)
-        self.identity = boto3.client('sts',region_name=self.region_name).get_caller_identity()['Arn']
-        self.aoss_client = boto3_session.client('opensearchserverless',region_name=self.region_name)
-        self.s3_client = boto3.client('s3',region_name=self.region_name)
-        self.bedrock_agent_client = boto3.client('bedrock-agent',region_name=self.region_name)
-        self.bedrock_agent_client = boto3.client(
-            'bedrock-agent',
-            region_name=self.region_name
-        )
+        self.identity = get_client('sts',region_name=self.region_name).get_caller_identity()['Arn']
+        self.aoss_client = get_client('opensearchserverless',region_name=self.region_name)
+        self.s3_client = get_client('s3',region_name=self.region_name)
+        self.bedrock_agent_client = get_client('bedrock-agent',region_name=self.region_name)
         credentials = boto3.Session().get_credentials()
         self.awsauth = AWSV4SignerAuth(credentials, self.region_name, 'aoss')
         self.oss_client = None
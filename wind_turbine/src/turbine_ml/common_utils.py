@@ -1,7 +1,7 @@
 import joblib
 import pandas as pd
 from datetime import datetime
-import boto3
+from src.helper.client_factory import get_client
 
 def save_model(model, path):
     joblib.dump(model, path)
@@ -17,7 +17,7 @@ def prepare_prediction_data(raw_data):
 
 def upload_to_partitioned_s3(local_path, s3_base_path, bucket='handsonllms-raghu'):
     """Upload files to S3 with date partitioning"""
-    s3 = boto3.client('s3')
+    s3 = get_client('s3')
     current_date = datetime.now().strftime("%Y-%m-%d")
     timestamp = datetime.now().strftime("%H%M%S")
     